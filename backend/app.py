@@ -1,18 +1,28 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
+from fastapi import FastAPI, HTTPException, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-import uvicorn
-import io
+import asyncio
 import os
-import boto3
+import tempfile
+import threading
+import time
+from functools import lru_cache, wraps
 from dotenv import load_dotenv
-import requests
 import base64
+import hashlib
+import json
+import mimetypes
 
-from azurePdfScraping import extract_pdf_data, save_markdown_data
-from openSourcePdf import extract_data, save_to_md
-from seleniumScraping import selenium_scraping
-from scrapingBee import scrape_page
+# The extraction and scraping backends (PyMuPDF, Azure SDK, Selenium, httpx,
+# boto3) are imported on first use of their endpoint to keep cold starts fast
+from extractionCache import ExtractionCache, cache_key
+from jobQueue import JobManager, QueueFullError
+from s3Uploader import S3Uploader, BatchUploadError
+from metrics import render_metrics, request_profile, request_seconds, requests_in_flight, slow_requests, timed
+from uploadSpool import SpooledUpload, spool_upload
 
 # Load environment variables
 load_dotenv(override=True)
@@ -24,24 +34,195 @@ S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
 S3_REGION = os.getenv("S3_REGION")
 SCRAPINGBEE_API_KEY = os.getenv("SCRAPING_BEE_KEY")
 
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=S3_REGION,
-)
+# Local tier size of the extraction cache
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Background job pool: running jobs and how many more may wait before we answer 429
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_DEPTH", "16"))
+# Finished results are held until fetched, for at most this long and within this total size
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "600"))
+JOB_RESULT_MAX_BYTES = int(os.getenv("JOB_RESULT_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Warm Selenium browsers kept for /web/scrape (0 launches a fresh browser per request)
+SELENIUM_POOL_SIZE = int(os.getenv("SELENIUM_POOL_SIZE", "2"))
+SELENIUM_MAX_PAGES = int(os.getenv("SELENIUM_MAX_PAGES", "50"))
+
+# Bulk crawl limits for /web/scrape/batch
+BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "10000"))
+BATCH_GLOBAL_CONCURRENCY = int(os.getenv("BATCH_GLOBAL_CONCURRENCY", "64"))
+BATCH_PER_HOST_CONCURRENCY = int(os.getenv("BATCH_PER_HOST_CONCURRENCY", "4"))
+# Longest wait between retries of one URL, whatever a server's Retry-After asks for
+BATCH_MAX_BACKOFF = float(os.getenv("BATCH_MAX_BACKOFF", "30"))
+
+# Image downloads for /web/scrape
+IMAGE_FETCH_WORKERS = int(os.getenv("IMAGE_FETCH_WORKERS", "16"))
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", "10"))
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# Multipart part size for streamed uploads; S3 rejects parts under 5 MiB (except the last), so smaller values are raised to that
+S3_PART_SIZE = max(int(os.getenv("S3_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+
+# Uploaded PDFs are spooled to disk in chunks of this size (the directory defaults to the system temp dir)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# Per-URL revalidation for /web/scrape: entries expire this long after their full scrape (0 disables it)
+WEB_SCRAPE_CACHE_TTL = float(os.getenv("WEB_SCRAPE_CACHE_TTL", "86400"))
+# Selenium renders JavaScript the revalidation probe cannot see, so its entries expire much sooner (0 disables them)
+WEB_SCRAPE_RENDERED_CACHE_TTL = float(os.getenv("WEB_SCRAPE_RENDERED_CACHE_TTL", "3600"))
+WEB_SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("WEB_SCRAPE_CACHE_MAX_ENTRIES", "10000"))
+WEB_SCRAPE_PROBE_TIMEOUT = float(os.getenv("WEB_SCRAPE_PROBE_TIMEOUT", "10"))
+
+# SQLite full-text index over every extracted document, served by /search (next to this file
+# unless set, whatever the working directory)
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_index.db"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
+
+# Presigned links let the dashboard load result images straight from S3; only keys in an
+# images/ folder under these prefixes are signed, never uploaded PDFs or cached markdown
+S3_PRESIGN_SECONDS = int(os.getenv("S3_PRESIGN_SECONDS", "3600"))
+PRESIGN_MAX_KEYS = int(os.getenv("PRESIGN_MAX_KEYS", "100"))
+PRESIGN_PREFIXES = ("pdf_extraction/", "web_scraping/")
+
+# Concurrent S3 uploads; the client's connection pool is sized to match
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "16"))
+
+# Requests slower than this are logged with their route and status
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "10"))
+
+# Honour "X-Profile: 1" with a cProfile dump of the request's pipeline stages (off by default)
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "scraper-profiles"))
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        "s3",
+        aws_access_key_id=AWS_ACCESS_KEY,
+        aws_secret_access_key=AWS_SECRET_KEY,
+        region_name=S3_REGION,
+        config=Config(
+            max_pool_connections=S3_UPLOAD_WORKERS,
+            retries={"max_attempts": 5, "mode": "adaptive"},
+            tcp_keepalive=True
+        )
+    )
+
+
+class _LazyS3Client:
+    """Stands in for the S3 client so boto3 is only loaded by the first S3 call."""
+
+    def __getattr__(self, name):
+        return getattr(get_s3_client(), name)
+
+
+s3_client = _LazyS3Client()
+
+uploader = S3Uploader(s3_client, S3_BUCKET_NAME, max_workers=S3_UPLOAD_WORKERS, multipart_threshold=S3_PART_SIZE)
+
+extraction_cache = ExtractionCache(s3_client, S3_BUCKET_NAME, EXTRACTION_CACHE_MAX_BYTES)
+
+job_manager = JobManager(JOB_WORKERS, JOB_QUEUE_DEPTH, result_ttl=JOB_RESULT_TTL, max_result_bytes=JOB_RESULT_MAX_BYTES)
+
+@lru_cache(maxsize=None)
+def get_image_fetcher():
+    from imageFetcher import ImageFetcher
+
+    return ImageFetcher(max_workers=IMAGE_FETCH_WORKERS, timeout=IMAGE_FETCH_TIMEOUT, max_bytes=IMAGE_MAX_BYTES)
+
+scrape_cache = None
+search_index = None
+_lazy_init_lock = threading.Lock()
+
+
+def get_scrape_cache():
+    """The per-URL scrape cache, created on first use (None when WEB_SCRAPE_CACHE_TTL is 0)."""
+    global scrape_cache
+    if WEB_SCRAPE_CACHE_TTL <= 0:
+        return None
+    # Locked so concurrent first requests share one instance
+    with _lazy_init_lock:
+        if scrape_cache is None:
+            from scrapeCache import ScrapeCache
+
+            scrape_cache = ScrapeCache(max_entries=WEB_SCRAPE_CACHE_MAX_ENTRIES, ttl=WEB_SCRAPE_CACHE_TTL, timeout=WEB_SCRAPE_PROBE_TIMEOUT)
+        return scrape_cache
+
+
+def get_search_index():
+    global search_index
+    with _lazy_init_lock:
+        if search_index is None:
+            from searchIndex import SearchIndex
+
+            search_index = SearchIndex(SEARCH_INDEX_PATH)
+        return search_index
+
+def index_for_search(s3_key: str, source: str, sections, name: str = None):
+    # The extraction already succeeded and is in S3; a failed index update is only logged
+    try:
+        get_search_index().index_document(s3_key, source, sections, name=name)
+    except Exception as e:
+        print(f"Search indexing failed for {s3_key}: {str(e)}")
+
+@timed("upload_to_s3", bytes_in=lambda file_content, *args, **kwargs: len(file_content))
+def upload_to_s3(file_content: bytes, folder: str, filename: str, content_type: str) -> str:
+    try:
+        return uploader.upload(file_content, folder, filename, content_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"S3 Upload Failed: {str(e)}")
+
+def upload_batch_to_s3(items, pending=()) -> list:
+    # items: (file_content, folder, filename, content_type) tuples uploaded concurrently
+    try:
+        return uploader.upload_batch(items, pending=pending)
+    except BatchUploadError as e:
+        raise HTTPException(status_code=500, detail=f"S3 Upload Failed: {str(e)}")
+
+def stream_to_s3(chunks, folder: str, filename: str, content_type: str):
+    """Multipart-upload text chunks to S3 while yielding them on to the caller.
 
-def upload_to_s3(file_content: bytes, folder: str, filename: str, content_type: str) -> None:
+    At most one part is buffered at a time, so memory stays bounded by
+    S3_PART_SIZE plus the largest chunk.
+    """
     s3_path = f"{folder}/{filename}"
+    upload = s3_client.create_multipart_upload(Bucket=S3_BUCKET_NAME, Key=s3_path, ContentType=content_type)
+    upload_id = upload["UploadId"]
+    parts = []
+    buffer = bytearray()
+
+    def upload_part():
+        response = s3_client.upload_part(
+            Bucket=S3_BUCKET_NAME,
+            Key=s3_path,
+            UploadId=upload_id,
+            PartNumber=len(parts) + 1,
+            Body=bytes(buffer)
+        )
+        parts.append({"ETag": response["ETag"], "PartNumber": len(parts) + 1})
+        buffer.clear()
+
     try:
-        s3_client.put_object(
+        for chunk in chunks:
+            buffer += chunk.encode()
+            if len(buffer) >= S3_PART_SIZE:
+                upload_part()
+            yield chunk
+        if buffer or not parts:
+            upload_part()
+        s3_client.complete_multipart_upload(
             Bucket=S3_BUCKET_NAME,
             Key=s3_path,
-            Body=file_content,
-            ContentType=content_type
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"S3 Upload Failed: {str(e)}")
+    except BaseException:
+        s3_client.abort_multipart_upload(Bucket=S3_BUCKET_NAME, Key=s3_path, UploadId=upload_id)
+        raise
 
 app = FastAPI(title="PDF and Web Scraping API")
 
@@ -53,135 +234,611 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    profiling = PROFILE_REQUESTS and request.headers.get("X-Profile") == "1"
+    requests_in_flight.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        with request_profile(profiling) as profiler:
+            response = await call_next(request)
+        status = response.status_code
+    finally:
+        requests_in_flight.dec()
+        # Streaming responses are measured until their headers go out
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        request_seconds.observe(elapsed, method=request.method, route=route_path, status=status)
+        if elapsed >= SLOW_REQUEST_SECONDS:
+            slow_requests.inc(method=request.method, route=route_path)
+            print(f"Slow request: {request.method} {route_path} -> {status} in {elapsed:.2f}s")
+
+    if profiling:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile_path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{request.method}-{route_path.strip('/').replace('/', '_')}.prof")
+        profiler.dump_stats(profile_path)
+        response.headers["X-Profile-File"] = profile_path
+    return response
+
+
+browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """The shared browser pool, created by the first Selenium scrape (None when disabled)."""
+    global browser_pool
+    if SELENIUM_POOL_SIZE <= 0:
+        return None
+    with _browser_pool_lock:
+        if browser_pool is None:
+            from browserPool import BrowserPool
+            from seleniumScraping import resolve_driver_path, chrome_options
+            try:
+                # The driver binary is resolved here once instead of on every request
+                browser_pool = BrowserPool(resolve_driver_path(), chrome_options, size=SELENIUM_POOL_SIZE, max_pages=SELENIUM_MAX_PAGES)
+            except Exception as e:
+                print(f"Browser pool disabled: {str(e)}")
+        return browser_pool
+
+
+@app.on_event("shutdown")
+def stop_browser_pool():
+    if browser_pool is not None:
+        browser_pool.close()
+
 class WebScrapingRequest(BaseModel):
     url: str
     method: str
     api_key: str = None
 
 
+class BatchScrapingRequest(BaseModel):
+    urls: list[str]
+    method: str = "Direct"
+
+
+class PresignRequest(BaseModel):
+    keys: list[str]
+
+
+def _report(progress, fraction, message):
+    if progress:
+        progress(fraction, message)
+
+
+# The pipelines below are blocking (fitz, Azure pollers, Selenium, requests, boto3).
+# Endpoints run them in the threadpool and /jobs runs them on the job workers, so
+# none of them ever execute on the event loop.
+
+def releases_upload(pipeline):
+    """The PDF pipelines own their SpooledUpload and delete it when they finish.
+
+    The file outlives the call while a background upload still streams it to S3.
+    """
+    @wraps(pipeline)
+    def wrapper(upload: SpooledUpload, *args, **kwargs):
+        try:
+            return pipeline(upload, *args, **kwargs)
+        finally:
+            upload.release()
+    return wrapper
+
+
+@releases_upload
+def process_enterprise_pdf(upload: SpooledUpload, progress=None):
+    from azurePdfScraping import extract_pdf_data, save_markdown_data, EXTRACTOR_VERSION as AZURE_EXTRACTOR_VERSION
+    from markdownRender import table_markdown
+    from searchIndex import markdown_sections
+
+    # Resubmitted PDFs are served from the cache without calling Azure again
+    key = cache_key(upload.sha256, "enterprise", AZURE_EXTRACTOR_VERSION)
+    cached_markdown = extraction_cache.get(key, "pdf_extraction/enterprise/markdown")
+    if cached_markdown is not None:
+        return {
+            "message": "Served the PDF extraction from cache.",
+            "markdown_content": cached_markdown,
+            "cached": True
+        }
+
+    # Upload the original PDF in the background while extracting
+    original_upload = upload.keep_until(uploader.submit_file(upload.path, "pdf_extraction/enterprise", upload.filename, "application/pdf"))
+
+    _report(progress, 0.2, "Extracting with Azure Form Recognizer")
+    extracted_data = extract_pdf_data(upload.path)
+
+    if not extracted_data:
+        raise HTTPException(status_code=400, detail="No Data Extracted From the PDF")
+
+    _report(progress, 0.7, "Rendering markdown")
+    markdown_content = save_markdown_data(extracted_data)
+
+    _report(progress, 0.8, "Uploading results")
+    md_filename = upload.filename.replace(".pdf", ".md")
+    uploads = [(markdown_content.encode(), "pdf_extraction/enterprise/markdown", md_filename, "text/markdown")]
+    for image_data in extracted_data.get("images", []):
+        image_content = base64.b64decode(image_data['base64'])
+        uploads.append((image_content, "pdf_extraction/enterprise/images", image_data['filename'], "image/png"))
+    s3_paths = upload_batch_to_s3(uploads, pending=[original_upload])
+    extraction_cache.put(key, "pdf_extraction/enterprise/markdown", markdown_content)
+
+    _report(progress, 0.9, "Indexing for search")
+    # Azure's markdown has no page headings: page text comes from the extraction, and every table
+    # (including those with no known page) from its own markdown, so the text is not indexed twice
+    sections = [
+        {"page": page["page_number"], "title": f"Page {page['page_number']}", "text": page["text"]}
+        for page in extracted_data["pages"] if page["text"].strip()
+    ]
+    sections += markdown_sections("".join(table_markdown(table) for table in extracted_data["tables"]))
+    index_for_search(s3_paths[0], "pdf_extraction/enterprise", sections, upload.filename)
+
+    return {
+        "message": "Successfully processed the PDF and saved to S3.",
+        "markdown_content": markdown_content
+    }
+
+
+def _opensource_cache_key(upload, inline_images):
+    from openSourcePdf import EXTRACTOR_VERSION as OPENSOURCE_EXTRACTOR_VERSION
+
+    # Inline and linked image markdown are different outputs for the same PDF
+    extractor = "opensource" if inline_images else "opensource-linked"
+    return cache_key(upload.sha256, extractor, OPENSOURCE_EXTRACTOR_VERSION)
+
+
+@releases_upload
+def process_opensource_pdf(upload: SpooledUpload, inline_images: bool = True, progress=None):
+    from openSourcePdf import extract_data, save_to_md
+    from searchIndex import markdown_sections
+
+    key = _opensource_cache_key(upload, inline_images)
+    cached = extraction_cache.get_entry(key, "pdf_extraction/opensource/markdown")
+    if cached is not None:
+        cached_markdown, details = cached
+        return {
+            "message": "Served the PDF extraction from cache.",
+            "markdown_content": cached_markdown,
+            # None for results cached before the stats were stored with them
+            "image_stats": details.get("image_stats"),
+            "cached": True
+        }
+
+    original_upload = upload.keep_until(uploader.submit_file(upload.path, "pdf_extraction/opensource", upload.filename, "application/pdf"))
+
+    _report(progress, 0.2, "Extracting with PyMuPDF")
+    extracted_data = extract_data(upload.path)
+
+    if not extracted_data:
+        raise HTTPException(status_code=400, detail="No Data Extracted From the PDF")
+
+    _report(progress, 0.7, "Rendering markdown")
+    markdown_content = save_to_md(extracted_data, inline_images=inline_images)
+
+    _report(progress, 0.8, "Uploading results")
+    md_filename = upload.filename.replace(".pdf", ".md")
+    uploads = [(markdown_content.encode(), "pdf_extraction/opensource/markdown", md_filename, "text/markdown")]
+    for image_data in extracted_data.get("images", []):
+        uploads.append((image_data['data'], "pdf_extraction/opensource/images", image_data['filename'], image_data['content_type']))
+    s3_paths = upload_batch_to_s3(uploads, pending=[original_upload])
+    extraction_cache.put(key, "pdf_extraction/opensource/markdown", markdown_content, {"image_stats": extracted_data["image_stats"]})
+
+    _report(progress, 0.9, "Indexing for search")
+    index_for_search(s3_paths[0], "pdf_extraction/opensource", markdown_sections(markdown_content), upload.filename)
+
+    return {
+        "message": "Successfully processed the PDF and saved to S3.",
+        "markdown_content": markdown_content,
+        "image_stats": extracted_data["image_stats"]
+    }
+
+
+def stream_opensource_pdf(upload: SpooledUpload, inline_images: bool = True):
+    from openSourcePdf import stream_markdown
+    from searchIndex import SectionSplitter
+
+    # The spooled upload is released here on a cache hit or error, otherwise once the response is done
+    try:
+        key = _opensource_cache_key(upload, inline_images)
+        cached_markdown = extraction_cache.get(key, "pdf_extraction/opensource/markdown")
+        if cached_markdown is not None:
+            upload.release()
+            return StreamingResponse(iter([cached_markdown]), media_type="text/markdown")
+
+        pending_uploads = [upload.keep_until(uploader.submit_file(upload.path, "pdf_extraction/opensource", upload.filename, "application/pdf"))]
+    except BaseException:
+        upload.release()
+        raise
+
+    # Stream markdown page by page to the client and to S3 at the same time
+    def upload_image(image_data):
+        pending_uploads.append(uploader.submit(image_data['data'], "pdf_extraction/opensource/images", image_data['filename'], image_data['content_type']))
+
+    md_filename = upload.filename.replace(".pdf", ".md")
+    chunks = stream_markdown(upload.path, on_image=upload_image, inline_images=inline_images)
+    # Sections are collected as the markdown passes through; image lines are not kept
+    splitter = SectionSplitter()
+
+    def split_for_search(chunks):
+        for chunk in chunks:
+            splitter.feed(chunk)
+            yield chunk
+
+    def stream_and_cache():
+        try:
+            yield from stream_to_s3(split_for_search(chunks), "pdf_extraction/opensource/markdown", md_filename, "text/markdown")
+            upload_batch_to_s3([], pending=pending_uploads)
+            # Server-side copy so the cache entry never has to be held in memory
+            extraction_cache.link(key, "pdf_extraction/opensource/markdown", f"pdf_extraction/opensource/markdown/{md_filename}")
+            index_for_search(f"pdf_extraction/opensource/markdown/{md_filename}", "pdf_extraction/opensource", splitter.close(), upload.filename)
+        finally:
+            upload.release()
+
+    # The background task also runs when the client left before the body was iterated,
+    # in which case the generator's finally never does; releasing twice is harmless
+    return StreamingResponse(stream_and_cache(), media_type="text/markdown", background=BackgroundTask(upload.release))
+
+
+@releases_upload
+def process_auto_pdf(upload: SpooledUpload, inline_images: bool = True, progress=None):
+    from azurePdfScraping import EXTRACTOR_VERSION as AZURE_EXTRACTOR_VERSION
+    from hybridPdf import extract_hybrid
+    from openSourcePdf import save_to_md, EXTRACTOR_VERSION as OPENSOURCE_EXTRACTOR_VERSION
+    from searchIndex import markdown_sections
+
+    # Output depends on both extractors, so both versions are part of the key
+    extractor = "auto" if inline_images else "auto-linked"
+    key = cache_key(upload.sha256, extractor, f"{OPENSOURCE_EXTRACTOR_VERSION}.{AZURE_EXTRACTOR_VERSION}")
+    cached = extraction_cache.get_entry(key, "pdf_extraction/auto/markdown")
+    if cached is not None:
+        cached_markdown, details = cached
+        return {
+            "message": "Served the PDF extraction from cache.",
+            "markdown_content": cached_markdown,
+            # None for results cached before the stats were stored with them
+            "image_stats": details.get("image_stats"),
+            "cached": True
+        }
+
+    original_upload = upload.keep_until(uploader.submit_file(upload.path, "pdf_extraction/auto", upload.filename, "application/pdf"))
+
+    _report(progress, 0.2, "Extracting text-layer pages with PyMuPDF and scanned pages with Azure")
+    extracted_data = extract_hybrid(upload.path)
+
+    _report(progress, 0.7, "Rendering markdown")
+    markdown_content = save_to_md(extracted_data, inline_images=inline_images)
+
+    _report(progress, 0.8, "Uploading results")
+    md_filename = upload.filename.replace(".pdf", ".md")
+    uploads = [(markdown_content.encode(), "pdf_extraction/auto/markdown", md_filename, "text/markdown")]
+    for image_data in extracted_data["images"]:
+        uploads.append((image_data['data'], "pdf_extraction/auto/images", image_data['filename'], image_data['content_type']))
+    s3_paths = upload_batch_to_s3(uploads, pending=[original_upload])
+    extraction_cache.put(key, "pdf_extraction/auto/markdown", markdown_content, {"image_stats": extracted_data["image_stats"]})
+
+    _report(progress, 0.9, "Indexing for search")
+    index_for_search(s3_paths[0], "pdf_extraction/auto", markdown_sections(markdown_content), upload.filename)
+
+    return {
+        "message": "Successfully processed the PDF and saved to S3.",
+        "markdown_content": markdown_content,
+        "image_stats": extracted_data["image_stats"],
+        "routing": extracted_data["routing"],
+        "timing": extracted_data["timing"]
+    }
+
+
+def _stored_web_scrape(entry):
+    # The markdown of the last full scrape, read back from S3 (None if it is gone)
+    from botocore.exceptions import ClientError
+
+    try:
+        response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=entry["s3_paths"]["markdown"])
+    except ClientError:
+        return None
+    return {
+        "message": "Page unchanged since the last scrape; served the stored result from S3.",
+        "markdown_content": response["Body"].read().decode(),
+        "image_urls": entry["s3_paths"]["images"],
+        "image_stats": entry["image_stats"],
+        "cached": True
+    }
+
+
+def process_web_scrape(url: str, method: str, progress=None):
+    from searchIndex import markdown_sections
+
+    if method not in ("Selenium", "ScrapingBee"):
+        raise HTTPException(status_code=400, detail="Invalid Scraping Method")
+    if method == "ScrapingBee" and not SCRAPINGBEE_API_KEY:
+        raise HTTPException(status_code=400, detail="ScrapingBee API key not configured")
+
+    # A cheap conditional request first; unchanged pages are not scraped or uploaded again
+    rendered = method == "Selenium"
+    cache_ttl = WEB_SCRAPE_RENDERED_CACHE_TTL if rendered else WEB_SCRAPE_CACHE_TTL
+    cache = get_scrape_cache() if cache_ttl > 0 else None
+    probe = None
+    if cache is not None:
+        _report(progress, 0.05, "Checking whether the page changed")
+        entry = cache.get(url, method)
+        probe = cache.probe(url, entry, rendered=rendered)
+        if probe["status"] in ("not_modified", "unchanged"):
+            stored = _stored_web_scrape(entry)
+            if stored is not None:
+                # Validators may have changed; the TTL still counts from the full scrape
+                cache.put(url, method, probe["validators"], probe["fingerprint"], entry["s3_paths"], entry["image_stats"], scraped_at=entry["scraped_at"], ttl=entry["ttl"])
+                return stored
+
+    _report(progress, 0.1, f"Scraping with {method}")
+    if method == "Selenium":
+        from seleniumScraping import selenium_scraping
+
+        # Call selenium scraping
+        markdown_content, images = selenium_scraping(url, pool=get_browser_pool())
+        folder = "web_scraping/selenium"
+    else:
+        from scrapingBee import scrape_page
+
+        # Call scrapingbee scraping
+        markdown_content, images = scrape_page(url, SCRAPINGBEE_API_KEY)
+        folder = "web_scraping/scrapingbee"
+
+    if markdown_content.startswith("Error"):
+        raise HTTPException(status_code=500, detail=markdown_content)
+
+    # One folder per URL, so the paths stored in the scrape cache stay valid
+    url_folder = f"{folder}/{hashlib.sha256(url.encode()).hexdigest()}"
+
+    _report(progress, 0.5, f"Downloading {len(images)} images")
+    # The URL and markdown go out with the images (separate folder for images)
+    uploads = [
+        (url.encode(), url_folder, "scraped_url.txt", "text/plain"),
+        (markdown_content.encode(), url_folder, "scraped_data.md", "text/markdown")
+    ]
+    # Same URL or same bytes (a repeated logo) is uploaded only once
+    fetched_images, image_stats = get_image_fetcher().fetch_all(images)
+    for index, image in enumerate(fetched_images):
+        extension = mimetypes.guess_extension(image["content_type"]) or ".jpg"
+        uploads.append((image["content"], f"{url_folder}/images", f"image_{index + 1}{extension}", image["content_type"]))
+
+    _report(progress, 0.9, "Uploading results")
+    s3_paths = upload_batch_to_s3(uploads)
+    image_urls = s3_paths[2:]
+
+    if probe is not None:
+        cache.put(url, method, probe["validators"], probe["fingerprint"], {"markdown": s3_paths[1], "images": image_urls}, image_stats, ttl=cache_ttl)
+
+    # Scraped pages keep all headings at the top, so the page is indexed as one section
+    index_for_search(s3_paths[1], folder, markdown_sections(markdown_content, split_at_headings=False), url)
+
+    return {
+        "message": "Scraping completed and saved to S3.",
+        "markdown_content": markdown_content,
+        "image_urls": image_urls,  # Return the URLs of the uploaded images
+        "image_stats": image_stats
+    }
+
+
+async def read_upload(file: UploadFile) -> SpooledUpload:
+    # Spooled to disk and hashed chunk by chunk; the pipeline it is handed to deletes it
+    return await spool_upload(file, UPLOAD_SPOOL_DIR, UPLOAD_CHUNK_SIZE)
+
 
 @app.post("/pdf/enterprise-scrape")
 async def enterprise_pdf_scrape(file: UploadFile = File(...)):
     try:
-        contents = await file.read()
-        
-        # Upload the original PDF to S3
-        upload_to_s3(contents, "pdf_extraction/enterprise", file.filename, "application/pdf")
-        
-        pdf_file_io = io.BytesIO(contents)
-        extracted_data = extract_pdf_data(pdf_file_io)
-        
-        if extracted_data:
-            markdown_content = save_markdown_data(extracted_data)
-            
-            md_filename = file.filename.replace(".pdf", ".md")
-            upload_to_s3(markdown_content.encode(), "pdf_extraction/enterprise/markdown", md_filename, "text/markdown")
-            
-            for image_data in extracted_data.get("images", []):
-                image_filename = image_data['filename']
-                image_content = base64.b64decode(image_data['base64'])
-                upload_to_s3(image_content, "pdf_extraction/enterprise/images", image_filename, "image/png")
-            
-            return {
-                "message": "Successfully processed the PDF and saved to S3.",
-                "markdown_content": markdown_content
-            }
-        else:
-            raise HTTPException(status_code=400, detail="No Data Extracted From the PDF")
+        upload = await read_upload(file)
+        return await run_in_threadpool(process_enterprise_pdf, upload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/pdf/opensource-scrape")
+async def opensource_pdf_scrape(file: UploadFile = File(...), stream: bool = False, inline_images: bool = True):
+    try:
+        upload = await read_upload(file)
+        if stream:
+            return await run_in_threadpool(stream_opensource_pdf, upload, inline_images)
+        return await run_in_threadpool(process_opensource_pdf, upload, inline_images)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/pdf/opensource-scrape")
-async def opensource_pdf_scrape(file: UploadFile = File(...)):
+@app.post("/pdf/auto-scrape")
+async def auto_pdf_scrape(file: UploadFile = File(...), inline_images: bool = True):
     try:
-        contents = await file.read()
-        
-        upload_to_s3(contents, "pdf_extraction/opensource", file.filename, "application/pdf")
-        
-        pdf_file_io = io.BytesIO(contents)
-        extracted_data = extract_data(pdf_file_io)
-        
-        if extracted_data:
-            markdown_content = save_to_md(extracted_data)
-            
-            md_filename = file.filename.replace(".pdf", ".md")
-            upload_to_s3(markdown_content.encode(), "pdf_extraction/opensource/markdown", md_filename, "text/markdown")
-            
-            for image_data in extracted_data.get("images", []):
-                image_filename = image_data['filename']
-                image_content = base64.b64decode(image_data['base64'])
-                upload_to_s3(image_content, "pdf_extraction/opensource/images", image_filename, "image/png")
-            
-            return {
-                "message": "Successfully processed the PDF and saved to S3.",
-                "markdown_content": markdown_content
-            }
-        else:
-            raise HTTPException(status_code=400, detail="No Data Extracted From the PDF")
+        upload = await read_upload(file)
+        return await run_in_threadpool(process_auto_pdf, upload, inline_images)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def presign_keys(keys) -> dict:
+    # Signing is local; no request goes to S3
+    return {
+        key: s3_client.generate_presigned_url("get_object", Params={"Bucket": S3_BUCKET_NAME, "Key": key}, ExpiresIn=S3_PRESIGN_SECONDS)
+        for key in keys
+    }
 
 
+@app.post("/s3/presign")
+async def presign_s3_keys(request: PresignRequest):
+    if len(request.keys) > PRESIGN_MAX_KEYS:
+        raise HTTPException(status_code=400, detail=f"At most {PRESIGN_MAX_KEYS} keys per request")
+    for key in request.keys:
+        parts = key.split("/")
+        if not key.startswith(PRESIGN_PREFIXES) or ".." in parts or len(parts) < 3 or parts[-2] != "images" or not parts[-1]:
+            raise HTTPException(status_code=400, detail=f"Not a result image: {key}")
+    try:
+        return {"urls": await run_in_threadpool(presign_keys, request.keys)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
+@app.get("/search")
+async def search(q: str, source: str = None, limit: int = 20, offset: int = 0):
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+    try:
+        return await run_in_threadpool(get_search_index().search, q, source, limit, offset)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
+@app.get("/cache/stats")
+async def cache_stats():
+    cache = get_scrape_cache()
+    return dict(extraction_cache.snapshot(), web_scrape=cache.snapshot() if cache is not None else None)
 
 
 @app.post("/web/scrape")
 async def web_scrape(request: WebScrapingRequest):
     try:
-        if request.method == "Selenium":
-            # Call selenium scraping
-            markdown_content, images = selenium_scraping(request.url)
-            folder = "web_scraping/selenium"
-        elif request.method == "ScrapingBee":
-            if not SCRAPINGBEE_API_KEY:
-                raise HTTPException(status_code=400, detail="ScrapingBee API key not configured")
-            # Call scrapingbee scraping
-            markdown_content, images = scrape_page(request.url, SCRAPINGBEE_API_KEY)
-            folder = "web_scraping/scrapingbee"
-        else:
-            raise HTTPException(status_code=400, detail="Invalid Scraping Method")
-        
-        if markdown_content.startswith("Error"):
-            raise HTTPException(status_code=500, detail=markdown_content)
-        
-        # Upload the URL to S3
-        url_filename = "scraped_url.txt"
-        upload_to_s3(request.url.encode(), folder, url_filename, "text/plain")
-        
-        # Upload the markdown content to S3
-        md_filename = "scraped_data.md"
-        upload_to_s3(markdown_content.encode(), folder, md_filename, "text/markdown")
-        
-        # Now upload the images to S3 (separate folder for images)
-        image_urls = []
-        for index, img in enumerate(images):
-            img_data = requests.get(img).content  # Download the image
-            image_filename = f"image_{index + 1}.jpg"
-
-            if request.method == "Selenium":
-                image_url = upload_to_s3(img_data, "web_scraping/selenium/images", image_filename, "image/jpeg")
-            elif request.method == "ScrapingBee":
-                image_url = upload_to_s3(img_data, "web_scraping/scrapingbee/images", image_filename, "image/jpeg")
-
-            image_urls.append(image_url)
-        
-        return {
-            "message": "Scraping completed and saved to S3.",
-            "markdown_content": markdown_content,
-            "image_urls": image_urls  # Return the URLs of the uploaded images
-        }
-    
+        return await run_in_threadpool(process_web_scrape, request.url, request.method)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.post("/web/scrape/batch")
+async def web_scrape_batch(request: BatchScrapingRequest):
+    if len(request.urls) > BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_URLS} URLs per batch")
+    if request.method == "ScrapingBee":
+        if not SCRAPINGBEE_API_KEY:
+            raise HTTPException(status_code=400, detail="ScrapingBee API key not configured")
+        api_key = SCRAPINGBEE_API_KEY
+    elif request.method == "Direct":
+        api_key = None
+    else:
+        raise HTTPException(status_code=400, detail="Invalid Scraping Method")
+
+    from batchCrawler import BatchCrawler
+    from searchIndex import markdown_sections
+
+    def index_scraped_page(s3_key, folder, markdown_content, url):
+        index_for_search(s3_key, folder, markdown_sections(markdown_content, split_at_headings=False), url)
+
+    crawler = BatchCrawler(
+        global_limit=BATCH_GLOBAL_CONCURRENCY,
+        per_host_limit=BATCH_PER_HOST_CONCURRENCY,
+        max_backoff=BATCH_MAX_BACKOFF,
+        api_key=api_key
+    )
+    folder = f"web_scraping/batch/{request.method.lower()}"
+
+    async def store(result, finished):
+        # Uploads run on the shared uploader pool, so many pages are stored at once
+        try:
+            if "markdown_content" in result:
+                md_filename = f"{hashlib.sha256(result['url'].encode()).hexdigest()}.md"
+                try:
+                    result["s3_path"] = await asyncio.wrap_future(
+                        uploader.submit(result["markdown_content"].encode(), folder, md_filename, "text/markdown")
+                    )
+                except Exception as e:
+                    result["error"] = f"S3 Upload Failed: {str(e)}"
+                else:
+                    await run_in_threadpool(index_scraped_page, result["s3_path"], folder, result["markdown_content"], result["url"])
+        finally:
+            await finished.put(result)
+
+    async def crawl(finished, stores):
+        try:
+            async for result in crawler.crawl(request.urls):
+                stores.append(asyncio.create_task(store(result, finished)))
+            await asyncio.gather(*stores)
+        finally:
+            await finished.put(None)
+
+    async def results():
+        # One NDJSON line per URL, in the order pages finish storing
+        finished = asyncio.Queue()
+        stores = []
+        crawling = asyncio.create_task(crawl(finished, stores))
+        try:
+            while (result := await finished.get()) is not None:
+                yield json.dumps(result) + "\n"
+            await crawling
+        finally:
+            for task in [crawling, *stores]:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    kind: str = Form(...),
+    file: UploadFile = File(None),
+    url: str = Form(None),
+    method: str = Form(None),
+    inline_images: bool = Form(True)
+):
+    upload = None
+    if kind in ("pdf-enterprise", "pdf-opensource", "pdf-auto"):
+        if file is None:
+            raise HTTPException(status_code=400, detail="A PDF file is required for PDF jobs")
+        upload = await read_upload(file)
+        if kind == "pdf-enterprise":
+            pipeline = process_enterprise_pdf
+            args = (upload,)
+        elif kind == "pdf-auto":
+            pipeline = process_auto_pdf
+            args = (upload, inline_images)
+        else:
+            pipeline = process_opensource_pdf
+            args = (upload, inline_images)
+    elif kind == "web-scrape":
+        if not url or not method:
+            raise HTTPException(status_code=400, detail="url and method are required for web scraping jobs")
+        pipeline = process_web_scrape
+        args = (url, method)
+    else:
+        raise HTTPException(status_code=400, detail="Invalid job kind")
+
+    try:
+        job = job_manager.submit(kind, pipeline, *args)
+    except QueueFullError as e:
+        if upload is not None:
+            upload.release()
+        return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": "5"})
+
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+    if job.status == "failed":
+        raise HTTPException(status_code=job.status_code, detail=job.error)
+    # Handed out once; the stored markdown lives on in S3
+    result = job_manager.take_result(job)
+    if result is None:
+        raise HTTPException(status_code=410, detail=f"Job result was already {job.result_dropped}")
+    return result
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8000)
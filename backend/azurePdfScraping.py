@@ -1,52 +1,183 @@
 import io
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 
+from markdownRender import rows_from_cells, table_markdown
+from metrics import timed
+from uploadSpool import pdf_source_size
+
 load_dotenv(override=True)
 
 # Replace these with your Azure Form Recognizer credentials
 AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT_URL")
 AZURE_KEY = os.getenv("AZURE_KEY_API")
 
+# Bump whenever the generated markdown changes so cached extractions are not reused
+EXTRACTOR_VERSION = "2"
+
+# Documents longer than this are split into page-range chunks analyzed concurrently (0 = never split)
+AZURE_CHUNK_PAGES = int(os.getenv("AZURE_CHUNK_PAGES", "50"))
+
+# Analyze pollers allowed in flight at once
+AZURE_MAX_IN_FLIGHT = int(os.getenv("AZURE_MAX_IN_FLIGHT", "4"))
+
+# Analyze submissions per second; keep under the resource's transactions-per-second quota
+AZURE_SUBMIT_RATE = float(os.getenv("AZURE_SUBMIT_RATE", "15"))
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    # The SDK is slow to import; build the client on first use, once per process
+    if not AZURE_ENDPOINT or not AZURE_KEY:
+        raise ValueError("AZURE_ENDPOINT_URL and AZURE_KEY_API must be set to use Azure Form Recognizer")
+    from azure.ai.formrecognizer import DocumentAnalysisClient
+    from azure.core.credentials import AzureKeyCredential
+
+    # Initialize the Azure Form Recognizer client
+    return DocumentAnalysisClient(
+        endpoint=AZURE_ENDPOINT,
+        credential=AzureKeyCredential(AZURE_KEY)
+    )
+
+class SubmitRateLimiter:
+    """Spaces calls to ``wait`` at least 1 / ``rate`` seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_submit_limiter = SubmitRateLimiter(AZURE_SUBMIT_RATE)
+
+
+def _open_pdf(pdf_source):
+    import fitz  # PyMuPDF
+
+    if isinstance(pdf_source, (str, os.PathLike)):
+        return fitz.open(pdf_source, filetype="pdf")
+    return fitz.open(stream=pdf_source, filetype="pdf")
+
+
+def _page_chunks(pdf_source, chunk_pages):
+    """Split the PDF (a path or bytes) into (first page, end page) ranges; None means the whole document.
+
+    Only the page count is read here: each chunk's PDF is built by
+    _analyze_chunk when it is submitted, so no more than the chunks in
+    flight are held in memory. A document short enough for one chunk is
+    sent as is, so a path is streamed from disk to Azure.
+    """
+    if chunk_pages <= 0:
+        return [None]
+    try:
+        doc = _open_pdf(pdf_source)
+    except Exception:
+        # Not something fitz can split; let Azure take it as a whole
+        return [None]
+    try:
+        page_count = doc.page_count
+    finally:
+        doc.close()
+    if page_count <= chunk_pages:
+        return [None]
+    return [(start, min(start + chunk_pages, page_count)) for start in range(0, page_count, chunk_pages)]
+
+
+def _chunk_pdf(pdf_source, start, end):
+    import fitz  # PyMuPDF
+
+    # Every chunk opens its own document; fitz documents are not shared across threads
+    doc = _open_pdf(pdf_source)
+    chunk = fitz.open()
+    try:
+        chunk.insert_pdf(doc, from_page=start, to_page=end - 1)
+        return chunk.tobytes()
+    finally:
+        chunk.close()
+        doc.close()
+
+
+def _analyze_chunk(client, pdf_source, page_range, limiter):
+    if page_range is None:
+        offset, chunk_source = 0, pdf_source
+    else:
+        offset, chunk_source = page_range[0], _chunk_pdf(pdf_source, *page_range)
+    limiter.wait()
+    if isinstance(chunk_source, (str, os.PathLike)):
+        with open(chunk_source, "rb") as chunk_file:
+            poller = client.begin_analyze_document("prebuilt-layout", chunk_file)
+            return offset, poller.result()
+    poller = client.begin_analyze_document("prebuilt-layout", io.BytesIO(chunk_source))
+    return offset, poller.result()
+
+
+def _table_page(table):
+    regions = getattr(table, "bounding_regions", None)
+    return regions[0].page_number if regions else None
+
+
+def _add_result(extracted_data, result, offset):
+    # Page numbers inside a chunk start at 1; shift them back to the full document
+    for page in result.pages:
+        page_text = "".join([line.content + "\n" for line in page.lines])
+        extracted_data["pages"].append({"page_number": page.page_number + offset, "text": page_text})
+
+    for table in result.tables:
+        cells = [{"row": cell.row_index, "column": cell.column_index, "text": cell.content} for cell in table.cells]
+        page_number = _table_page(table)
+        extracted_data["tables"].append({
+            "page": page_number + offset if page_number is not None else None,
+            "rows": rows_from_cells(cells, getattr(table, "row_count", None), getattr(table, "column_count", None))
+        })
 
-# Initialize the Azure Form Recognizer client
-client = DocumentAnalysisClient(
-    endpoint=AZURE_ENDPOINT,
-    credential=AzureKeyCredential(AZURE_KEY)
-)
 
 # Function to extract data (text and tables) from the PDF using Azure Form Recognizer
-def extract_pdf_data(pdf_file_io):
+@timed("extract_pdf_data", bytes_in=lambda pdf_source, *args, **kwargs: pdf_source_size(pdf_source), failed=lambda result: result is None)
+def extract_pdf_data(pdf_source, chunk_pages=None, max_in_flight=None, client=None):
+    """Analyze the PDF (a path on disk or a BytesIO) with the prebuilt layout model.
+
+    Documents longer than ``chunk_pages`` are split into page ranges that are
+    analyzed concurrently, at most ``max_in_flight`` pollers at a time, and
+    stitched back in page order. ``client`` defaults to get_client().
+    """
     try:
-        poller = client.begin_analyze_document("prebuilt-layout", pdf_file_io)
-        result = poller.result()
+        if chunk_pages is None:
+            chunk_pages = AZURE_CHUNK_PAGES
+        if max_in_flight is None:
+            max_in_flight = AZURE_MAX_IN_FLIGHT
+        if client is None:
+            client = get_client()
+
+        if isinstance(pdf_source, io.BytesIO):
+            pdf_source = pdf_source.getvalue()
+        chunks = _page_chunks(pdf_source, chunk_pages)
+        if len(chunks) == 1:
+            results = [_analyze_chunk(client, pdf_source, chunks[0], _submit_limiter)]
+        else:
+            # The SDK already retries throttled (429) calls; the limiter keeps bursts from tripping them
+            with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                results = list(executor.map(lambda page_range: _analyze_chunk(client, pdf_source, page_range, _submit_limiter), chunks))
 
         extracted_data = {
             "text": "",
             "tables": [],
             "pages": []
         }
-
-        # Extract text from each page
-        for page in result.pages:
-            page_text = ""
-            for line in page.lines:
-                page_text += line.content + "\n"
-            extracted_data["pages"].append({"page_number": page.page_number, "text": page_text})
-            extracted_data["text"] += page_text
-
-        # Extract tables
-        for table in result.tables:
-            table_data = []
-            for cell in table.cells:
-                table_data.append({
-                    "row": cell.row_index,
-                    "column": cell.column_index,
-                    "text": cell.content
-                })
-            extracted_data["tables"].append(table_data)
+        for offset, result in results:
+            _add_result(extracted_data, result, offset)
+        extracted_data["text"] = "".join([page["text"] for page in extracted_data["pages"]])
 
         return extracted_data
 
@@ -54,34 +185,34 @@ def extract_pdf_data(pdf_file_io):
         print(f"Error during extraction: {str(e)}")
         return None
 
-# Function to store extracted data in a markdown file
-def save_markdown_data(extracted_data):
+# Function to render extracted data as markdown, optionally also writing it to a file
+@timed("save_markdown_data", failed=lambda result: result is None, bytes_out=len)
+def save_markdown_data(extracted_data, output_file_path=None):
     try:
         if extracted_data is None:
             raise ValueError("No data extracted from PDF.")
 
-        markdown_content = f"# Extracted PDF Data\n\n"
+        parts = ["# Extracted PDF Data\n\n"]
 
         # Add extracted text
-        markdown_content += f"## Text Data\n\n{extracted_data['text']}\n\n"
+        parts.append(f"## Text Data\n\n{extracted_data['text']}\n\n")
 
         # Add extracted tables
         if extracted_data['tables']:
-            markdown_content += f"## Tables\n\n"
+            parts.append("## Tables\n\n")
             for table in extracted_data['tables']:
-                markdown_content += f"### Table\n\n"
-                for cell in table:
-                    markdown_content += f"Row: {cell['row']}, Column: {cell['column']} - {cell['text']}\n"
-                markdown_content += "\n"
+                parts.append(table_markdown(table))
+
+        markdown_content = "".join(parts)
 
-        # Check if the file path is valid
-        output_file_path = "extracted_data.md"
-        if os.path.isdir(output_file_path):
-            raise ValueError(f"The path '{output_file_path}' is a directory, not a file.")
+        if output_file_path is not None:
+            # Check if the file path is valid
+            if os.path.isdir(output_file_path):
+                raise ValueError(f"The path '{output_file_path}' is a directory, not a file.")
 
-        # Store the markdown content in a file
-        with open(output_file_path, "w") as md_file:
-            md_file.write(markdown_content)
+            # Store the markdown content in a file
+            with open(output_file_path, "w") as md_file:
+                md_file.write(markdown_content)
 
         return markdown_content
 
@@ -101,7 +232,7 @@ def main(pdf_path):
             
             # If data is extracted, save it to markdown
             if extracted_data:
-                markdown_content = save_markdown_data(extracted_data)
+                markdown_content = save_markdown_data(extracted_data, "extracted_data.md")
                 print(f"Successfully processed the PDF. Markdown content saved to 'extracted_data.md'.")
                 print(f"Markdown content preview:\n{markdown_content[:300]}...")  # Print preview of markdown content
             else:
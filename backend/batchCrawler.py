@@ -0,0 +1,88 @@
+import asyncio
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import httpx
+
+from scrapingBee import HEADERS, SCRAPING_BEE_ENDPOINT, html_to_markdown
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _retry_delay(response, attempt, backoff, max_backoff):
+    # Capped, so a server asking for an hour cannot hold the whole batch open
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), max_backoff)
+    return min(backoff * (2 ** attempt), max_backoff)
+
+
+class BatchCrawler:
+    """Fetch many URLs concurrently over one pooled async HTTP client.
+
+    ``global_limit`` caps requests in flight overall and ``per_host_limit``
+    caps them per target host. Responses in RETRY_STATUSES and transport
+    errors are retried with exponential backoff (or the server's Retry-After),
+    never waiting longer than ``max_backoff`` seconds at a time.
+    With ``api_key`` the pages are fetched through ScrapingBee, otherwise directly.
+    """
+
+    def __init__(self, global_limit: int = 64, per_host_limit: int = 4, retries: int = 3, backoff: float = 0.5, max_backoff: float = 30, timeout: float = 30, api_key: str = None):
+        self.global_limit = global_limit
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.api_key = api_key
+
+    def _request(self, url):
+        if self.api_key:
+            return SCRAPING_BEE_ENDPOINT, {"api_key": self.api_key, "url": url}
+        return url, None
+
+    async def _fetch(self, client, url, global_slots, host_slots):
+        request_url, params = self._request(url)
+        host_slot = host_slots[urlsplit(url).netloc]
+        error = None
+
+        for attempt in range(self.retries + 1):
+            response = None
+            # Host slot first so a busy host never ties up global slots
+            async with host_slot, global_slots:
+                try:
+                    response = await client.get(request_url, params=params)
+                except httpx.HTTPError as e:
+                    error = f"Error: An error occurred: {str(e)}"
+
+            if response is not None:
+                if response.status_code == 200:
+                    # Parsing is CPU bound; keep it off the event loop
+                    markdown_content, images = await asyncio.to_thread(html_to_markdown, response.text)
+                    return {"url": url, "status": 200, "attempts": attempt + 1, "markdown_content": markdown_content, "images": images}
+                error = f"Error: Failed to scrape the page. Status code: {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    return {"url": url, "status": response.status_code, "attempts": attempt + 1, "error": error}
+
+            if attempt < self.retries:
+                # Slots are released while backing off so other hosts keep moving
+                await asyncio.sleep(_retry_delay(response, attempt, self.backoff, self.max_backoff))
+
+        status = response.status_code if response is not None else None
+        return {"url": url, "status": status, "attempts": self.retries + 1, "error": error}
+
+    async def crawl(self, urls):
+        """Yield one result dict per URL as each one completes."""
+        global_slots = asyncio.Semaphore(self.global_limit)
+        host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+        limits = httpx.Limits(max_connections=self.global_limit, max_keepalive_connections=self.global_limit)
+
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout, headers=HEADERS, follow_redirects=True) as client:
+            tasks = [asyncio.create_task(self._fetch(client, url, global_slots, host_slots)) for url in urls]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+
+class BrowserPool:
+    """A fixed-size pool of long-lived headless Chrome drivers.
+
+    Drivers are created on demand up to ``size`` and handed out with
+    ``with pool.driver() as driver``. On return a driver is health checked,
+    its cookies and storage are cleared, and it is recycled once it has served
+    ``max_pages`` pages or stops responding.
+    """
+
+    def __init__(self, driver_path: str, options_factory, size: int = 2, max_pages: int = 50, checkout_timeout: float = 60):
+        self.driver_path = driver_path
+        self.options_factory = options_factory
+        self.size = size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self._idle = deque()
+        self._pages = {}
+        self._created = 0
+        # Guards _idle and _created; notified whenever a driver is returned or a slot frees up
+        self._available = threading.Condition()
+        self._closed = False
+
+    def _new_driver(self):
+        driver = webdriver.Chrome(service=Service(self.driver_path), options=self.options_factory())
+        self._pages[id(driver)] = 0
+        return driver
+
+    def _is_alive(self, driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _reset(self, driver):
+        # Storage is per origin, so clear it before leaving the last page
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.get("about:blank")
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            driver = None
+            with self._available:
+                # Wakes for a returned driver as well as for a discarded one whose slot can be refilled
+                while not self._idle and self._created >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No browser became available within {self.checkout_timeout}s")
+                    self._available.wait(remaining)
+                if self._idle:
+                    driver = self._idle.popleft()
+                else:
+                    self._created += 1
+
+            if driver is None:
+                try:
+                    return self._new_driver()
+                except Exception:
+                    with self._available:
+                        self._created -= 1
+                        self._available.notify()
+                    raise
+
+            if self._is_alive(driver):
+                return driver
+            self._discard(driver)
+
+    def _return(self, driver):
+        self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+        if self._closed or self._pages[id(driver)] >= self.max_pages or not self._is_alive(driver):
+            self._discard(driver)
+            return
+        try:
+            self._reset(driver)
+        except Exception:
+            self._discard(driver)
+            return
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    @contextmanager
+    def driver(self):
+        driver = self._checkout()
+        try:
+            yield driver
+        finally:
+            self._return(driver)
+
+    def close(self):
+        self._closed = True
+        with self._available:
+            idle = list(self._idle)
+            self._idle.clear()
+        for driver in idle:
+            self._discard(driver)
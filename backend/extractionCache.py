@@ -0,0 +1,98 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def cache_key(content_sha256: str, extractor: str, version: str) -> str:
+    # Content address of the upload (its SHA-256, taken while spooling), scoped to the extractor that produced the markdown
+    return hashlib.sha256(f"{extractor}:{version}:{content_sha256}".encode()).hexdigest()
+
+
+class ExtractionCache:
+    """Two-tier markdown cache: an in-process LRU bounded by size, backed by S3.
+
+    The S3 tier stores each result as ``<folder>/<key>.md`` so it survives
+    restarts and is shared between instances. Small per-result details (the
+    image dedup stats) ride along as object metadata.
+    """
+
+    def __init__(self, s3_client, bucket: str, max_bytes: int):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "s3_hits": 0, "misses": 0, "evictions": 0}
+
+    def _s3_path(self, key, folder):
+        return f"{folder}/{key}.md"
+
+    def _remember(self, key, markdown_content, details):
+        size = len(markdown_content.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (markdown_content, size, details)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.stats["evictions"] += 1
+
+    def get(self, key: str, folder: str):
+        entry = self.get_entry(key, folder)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str, folder: str):
+        """Return (markdown_content, details) for a cached result, or None; details is {} when none were stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["local_hits"] += 1
+                return entry[0], entry[2]
+
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self._s3_path(key, folder))
+            markdown_content = response["Body"].read().decode()
+        except ClientError:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        details = json.loads(response.get("Metadata", {}).get("details", "{}"))
+
+        with self._lock:
+            self.stats["s3_hits"] += 1
+        self._remember(key, markdown_content, details)
+        return markdown_content, details
+
+    def put(self, key: str, folder: str, markdown_content: str, details: dict = None) -> None:
+        details = details or {}
+        self._remember(key, markdown_content, details)
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=self._s3_path(key, folder),
+            Body=markdown_content.encode(),
+            ContentType="text/markdown",
+            Metadata={"details": json.dumps(details)}
+        )
+
+    def link(self, key: str, folder: str, s3_path: str) -> None:
+        # Register an already uploaded markdown object without pulling it into memory
+        self.s3_client.copy_object(
+            Bucket=self.bucket,
+            Key=self._s3_path(key, folder),
+            CopySource={"Bucket": self.bucket, "Key": s3_path},
+            ContentType="text/markdown",
+            MetadataDirective="REPLACE"
+        )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats, local_entries=len(self._entries), local_bytes=self._size)
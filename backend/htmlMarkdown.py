@@ -0,0 +1,251 @@
+import os
+from html import unescape
+from html.entities import html5
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+from metrics import timed
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional; "lxml" falls back to "stream"
+    lxml = None
+
+# "stream" (single-pass tokenizer, default), "lxml" (fastest) or "bs4" (the original tree walk)
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "stream")
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+# Tags html.parser/BeautifulSoup never leave open
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta",
+    "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer"
+}
+
+# Text inside these is not part of get_text() in BeautifulSoup
+STRING_CONTAINER_TAGS = {"rt", "rp", "style", "script", "template"}
+
+
+def _render(headings, paragraphs, images, links):
+    markdown_content = ["# Webpage Content\n\n"]
+    for text in headings:
+        markdown_content.append(f"## {text}\n\n")
+    for text in paragraphs:
+        markdown_content.append(f"{text}\n\n")
+    for img_url in images:
+        markdown_content.append(f"![Image]({img_url})\n\n")
+    for link_text, link_url in links:
+        markdown_content.append(f"[{link_text}]({link_url})\n")
+    return "".join(markdown_content)
+
+
+def _bs4_markdown(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    markdown_content = "# Webpage Content\n\n"
+    images = []  # List to hold image URLs
+
+    # Scrape headings
+    for header in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        markdown_content += f"## {header.get_text(strip=True)}\n\n"
+
+    # Scrape paragraphs
+    for para in soup.find_all('p'):
+        markdown_content += f"{para.get_text(strip=True)}\n\n"
+
+    # Scrape images
+    for img in soup.find_all('img', src=True):
+        img_url = img['src']
+        if img_url.startswith('http'):
+            markdown_content += f"![Image]({img_url})\n\n"
+            images.append(img_url)
+
+    # Scrape links
+    for link in soup.find_all('a', href=True):
+        link_text = link.get_text(strip=True)
+        link_url = link['href']
+        markdown_content += f"[{link_text}]({link_url})\n"
+
+    return markdown_content, images
+
+
+class _MarkdownCollector(HTMLParser):
+    """Collects headings, paragraphs, images and links in one pass without building a tree.
+
+    Mirrors how BeautifulSoup's html.parser builder nests tags and strips
+    strings, so the rendered markdown matches _bs4_markdown.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.headings = []
+        self.paragraphs = []
+        self.images = []
+        self.links = []
+        self._stack = []  # (tag, text parts being collected for it or None)
+        self._collecting = []
+        self._containers = 0
+        self._data = []
+        # Void tags already closed at their start tag (name -> count); a matching end tag is then a no-op
+        self._closed_void = {}
+
+    def _add_string(self, text):
+        text = text.strip()
+        if text:
+            for parts in self._collecting:
+                parts.append(text)
+
+    def _flush(self):
+        if self._data:
+            text = "".join(self._data)
+            self._data = []
+            if not self._containers:
+                self._add_string(text)
+
+    def _open(self, tag, attrs):
+        attrs = {name: "" if value is None else value for name, value in attrs}
+        parts = None
+        if tag in HEADING_TAGS:
+            parts = []
+            self.headings.append(parts)
+        elif tag == "p":
+            parts = []
+            self.paragraphs.append(parts)
+        elif tag == "a" and "href" in attrs:
+            parts = []
+            self.links.append((parts, attrs["href"]))
+        elif tag == "img" and attrs.get("src", "").startswith("http"):
+            self.images.append(attrs["src"])
+
+        self._stack.append((tag, parts))
+        if parts is not None:
+            self._collecting.append(parts)
+        if tag in STRING_CONTAINER_TAGS:
+            self._containers += 1
+
+    def _close(self, tag):
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index:
+            name, parts = self._stack.pop()
+            if parts is not None:
+                self._collecting.pop()
+            if name in STRING_CONTAINER_TAGS:
+                self._containers -= 1
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        self._open(tag, attrs)
+        if tag in VOID_TAGS:
+            self._close(tag)
+            self._closed_void[tag] = self._closed_void.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        self._open(tag, attrs)
+        self._close(tag)
+
+    def handle_endtag(self, tag):
+        if self._closed_void.get(tag):
+            self._closed_void[tag] -= 1
+            return
+        self._flush()
+        self._close(tag)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_entityref(self, name):
+        character = html5.get(f"{name};")
+        self._data.append(character if character is not None else f"&{name}")
+
+    def handle_charref(self, name):
+        self._data.append(unescape(f"&#{name};"))
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self._add_string(data[len("CDATA["):])
+
+    def markdown(self):
+        self._flush()
+        headings = ["".join(parts) for parts in self.headings]
+        paragraphs = ["".join(parts) for parts in self.paragraphs]
+        links = [("".join(parts), href) for parts, href in self.links]
+        return _render(headings, paragraphs, self.images, links), self.images
+
+
+def _stream_markdown(html):
+    collector = _MarkdownCollector()
+    collector.feed(html)
+    collector.close()
+    return collector.markdown()
+
+
+def _lxml_text(element):
+    # Same stripping as get_text(strip=True), skipping comments and script/style text
+    parts = []
+    pending = [element]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, str):
+            text = node.strip()
+            if text:
+                parts.append(text)
+            continue
+        if not isinstance(node.tag, str) or node.tag in STRING_CONTAINER_TAGS:
+            continue
+        # Pushed in reverse so text, then each child followed by its tail, pop in document order
+        for child in reversed(node):
+            if child.tail:
+                pending.append(child.tail)
+            pending.append(child)
+        if node.text:
+            pending.append(node.text)
+    return "".join(parts)
+
+
+def _lxml_markdown(html):
+    if not html.strip():
+        return _render([], [], [], []), []
+    root = lxml.html.document_fromstring(html)
+    headings = []
+    paragraphs = []
+    images = []
+    links = []
+    for element in root.iter("h1", "h2", "h3", "h4", "h5", "h6", "p", "img", "a"):
+        tag = element.tag
+        if tag in HEADING_TAGS:
+            headings.append(_lxml_text(element))
+        elif tag == "p":
+            paragraphs.append(_lxml_text(element))
+        elif tag == "img":
+            img_url = element.get("src")
+            if img_url is not None and img_url.startswith("http"):
+                images.append(img_url)
+        elif element.get("href") is not None:
+            links.append((_lxml_text(element), element.get("href")))
+    return _render(headings, paragraphs, images, links), images
+
+
+@timed("html_to_markdown", bytes_in=lambda html, *args, **kwargs: len(html))
+def html_to_markdown(html, backend=None):
+    backend = backend or HTML_PARSER_BACKEND
+    if backend == "bs4":
+        return _bs4_markdown(html)
+    if backend == "lxml" and lxml is not None:
+        return _lxml_markdown(html)
+    return _stream_markdown(html)
@@ -0,0 +1,159 @@
+import io
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz  # PyMuPDF
+from fastapi import HTTPException
+
+from azurePdfScraping import AZURE_CHUNK_PAGES, AZURE_MAX_IN_FLIGHT, extract_pdf_data
+from metrics import timed
+from openSourcePdf import PDF_MIN_IMAGE_SIDE, ImageIndex, page_tables, open_pdf
+from uploadSpool import pdf_source_size
+
+# Pages with fewer text-layer characters than this are OCR candidates
+HYBRID_MIN_TEXT_CHARS = int(os.getenv("HYBRID_MIN_TEXT_CHARS", "32"))
+
+# ...and are sent to Azure when images cover at least this fraction of the page
+HYBRID_MIN_IMAGE_COVERAGE = float(os.getenv("HYBRID_MIN_IMAGE_COVERAGE", "0.5"))
+
+
+def _image_coverage(page):
+    page_area = page.rect.get_area()
+    if not page_area:
+        return 0.0
+    covered = 0.0
+    for image in page.get_image_info():
+        covered += (fitz.Rect(image["bbox"]) & page.rect).get_area()
+    # Overlapping images can add up to more than the page
+    return min(covered / page_area, 1.0)
+
+
+def classify_page(page, text):
+    """Route a page to "local" (usable text layer) or "azure" (image-only, needs OCR)."""
+    text_chars = len(text.strip())
+    image_coverage = _image_coverage(page) if text_chars < HYBRID_MIN_TEXT_CHARS else None
+    scanned = image_coverage is not None and image_coverage >= HYBRID_MIN_IMAGE_COVERAGE
+    return {
+        "page": page.number + 1,
+        "route": "azure" if scanned else "local",
+        "text_chars": text_chars,
+        "image_coverage": round(image_coverage, 3) if image_coverage is not None else None
+    }
+
+
+def _scanned_pages_pdf(doc, page_nums):
+    sub_doc = fitz.open()
+    for page_num in page_nums:
+        sub_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
+    try:
+        return sub_doc.tobytes()
+    finally:
+        sub_doc.close()
+
+
+def _azure_waves(pages):
+    # Chunks analyzed one after another in rounds of AZURE_MAX_IN_FLIGHT, and the pages in the largest chunk
+    chunk_pages = AZURE_CHUNK_PAGES or pages
+    chunks = math.ceil(pages / chunk_pages)
+    return math.ceil(chunks / max(AZURE_MAX_IN_FLIGHT, 1)), min(pages, chunk_pages)
+
+
+def azure_only_estimate(azure_seconds, azure_pages, total_pages):
+    """Range for an Azure-only run of the whole document, scaled from the measured scanned-page run.
+
+    The low end assumes Azure time is all per-call overhead (it scales with the
+    rounds of concurrent chunks), the high end that it is all per-page work
+    (it also scales with the pages in a chunk). None when no page went to Azure.
+    """
+    if not azure_pages:
+        return None
+    measured_waves, measured_chunk = _azure_waves(azure_pages)
+    waves, chunk = _azure_waves(total_pages)
+    low = azure_seconds * waves / measured_waves
+    return low, low * chunk / measured_chunk
+
+
+def _extract_scanned(pdf_bytes, client):
+    start = time.perf_counter()
+    extracted_data = extract_pdf_data(io.BytesIO(pdf_bytes), client=client)
+    return extracted_data, time.perf_counter() - start
+
+
+@timed("extract_hybrid", bytes_in=lambda pdf_source, *args, **kwargs: pdf_source_size(pdf_source))
+def extract_hybrid(pdf_source, client=None, min_image_side: int = None):
+    """Extract born-digital pages with PyMuPDF and only the scanned ones with Azure.
+
+    ``pdf_source`` is a path to the PDF on disk or a BytesIO.
+
+    Scanned pages are copied into one sub-PDF that Azure analyzes while the
+    local pages are extracted; results are merged back in page order.
+    Returns the same shape as openSourcePdf.extract_data plus "routing" and
+    "timing".
+    """
+    if min_image_side is None:
+        min_image_side = PDF_MIN_IMAGE_SIDE
+
+    start = time.perf_counter()
+    doc = open_pdf(pdf_source)
+    try:
+        texts = []
+        routing = []
+        for page_num in range(doc.page_count):
+            page = doc.load_page(page_num)
+            texts.append(page.get_text("text"))
+            routing.append(classify_page(page, texts[-1]))
+        scanned = [decision["page"] - 1 for decision in routing if decision["route"] == "azure"]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            azure_future = executor.submit(_extract_scanned, _scanned_pages_pdf(doc, scanned), client) if scanned else None
+
+            local_start = time.perf_counter()
+            tables = []
+            images = []
+            image_index = ImageIndex(min_image_side)
+            for decision in routing:
+                if decision["route"] != "local":
+                    continue
+                page_num = decision["page"] - 1
+                page = doc.load_page(page_num)
+                tables.extend(page_tables(page, page_num))
+                images.extend(image_index.add_page(doc, page, page_num))
+            local_seconds = time.perf_counter() - local_start
+
+            azure_seconds = 0.0
+            if azure_future is not None:
+                azure_data, azure_seconds = azure_future.result()
+                if not azure_data:
+                    raise HTTPException(status_code=400, detail="No Data Extracted From the scanned pages")
+                # Sub-PDF page k is original page scanned[k - 1]
+                for azure_page in azure_data["pages"]:
+                    texts[scanned[azure_page["page_number"] - 1]] = azure_page["text"]
+                for table in azure_data["tables"]:
+                    if table["page"] is not None:
+                        table["page"] = scanned[table["page"] - 1] + 1
+                    tables.append(table)
+                tables.sort(key=lambda table: table["page"] or 0)
+    finally:
+        doc.close()
+
+    wall_seconds = time.perf_counter() - start
+    estimate = azure_only_estimate(azure_seconds, len(scanned), len(routing))
+    return {
+        "text": "".join(f"### Page {page_num + 1}\n\n{text}\n\n" for page_num, text in enumerate(texts)),
+        "tables": tables,
+        "images": images,
+        "image_stats": image_index.stats(),
+        "routing": routing,
+        "timing": {
+            "local_pages": len(routing) - len(scanned),
+            "azure_pages": len(scanned),
+            "local_seconds": round(local_seconds, 3),
+            "azure_seconds": round(azure_seconds, 3),
+            "wall_seconds": round(wall_seconds, 3),
+            # [low, high]; a rough range from this run's Azure timing, not a measurement
+            "estimated_azure_only_seconds": [round(seconds, 3) for seconds in estimate] if estimate else None,
+            "estimated_seconds_saved": [round(seconds - wall_seconds, 3) for seconds in estimate] if estimate else None
+        }
+    }
@@ -0,0 +1,84 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import timed
+
+
+class ImageTooLargeError(Exception):
+    pass
+
+
+class ImageFetcher:
+    """Concurrent image downloads over one pooled session.
+
+    Every request has a timeout and bodies are streamed with a ``max_bytes``
+    cutoff, so one huge image cannot stall or bloat the worker. ``fetch_all``
+    skips repeated URLs and keeps only the first image for each content hash.
+    """
+
+    def __init__(self, max_workers: int = 16, timeout: float = 10, max_bytes: int = 10 * 1024 * 1024, chunk_size: int = 64 * 1024):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @timed("image_fetch", bytes_out=lambda result: len(result["content"]))
+    def fetch(self, url: str) -> dict:
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            declared_size = response.headers.get("Content-Length")
+            if declared_size and declared_size.isdigit() and int(declared_size) > self.max_bytes:
+                raise ImageTooLargeError(f"Image is {declared_size} bytes (limit {self.max_bytes})")
+
+            body = bytearray()
+            for chunk in response.iter_content(self.chunk_size):
+                body += chunk
+                if len(body) > self.max_bytes:
+                    raise ImageTooLargeError(f"Image exceeds {self.max_bytes} bytes")
+
+            content_type = response.headers.get("Content-Type", "image/jpeg").split(";")[0].strip()
+            return {
+                "url": url,
+                "content": bytes(body),
+                "content_type": content_type,
+                "sha256": hashlib.sha256(body).hexdigest()
+            }
+
+    def _fetch_or_error(self, url):
+        try:
+            return self.fetch(url)
+        except (requests.exceptions.RequestException, ImageTooLargeError) as e:
+            return {"url": url, "error": str(e)}
+
+    def fetch_all(self, urls):
+        """Fetch ``urls`` concurrently; returns (unique images in first-seen order, stats)."""
+        unique_urls = list(dict.fromkeys(urls))
+
+        images = []
+        by_hash = {}
+        skipped = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for result in executor.map(self._fetch_or_error, unique_urls):
+                if "error" in result:
+                    skipped.append(result)
+                elif result["sha256"] in by_hash:
+                    by_hash[result["sha256"]]["duplicate_urls"].append(result["url"])
+                else:
+                    result["duplicate_urls"] = []
+                    by_hash[result["sha256"]] = result
+                    images.append(result)
+
+        stats = {
+            "requested": len(urls),
+            "unique_urls": len(unique_urls),
+            "unique_images": len(images),
+            "skipped": skipped
+        }
+        return images, stats
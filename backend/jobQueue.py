@@ -0,0 +1,157 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = "Waiting for a worker"
+        self.result = None
+        self.result_bytes = 0
+        # Why a finished job no longer holds its result: "fetched" or "expired"
+        self.result_dropped = None
+        self.finished_at = None
+        self.error = None
+        self.status_code = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    def report(self, progress: float, message: str = None) -> None:
+        # Passed to the pipeline functions as their progress callback
+        self.progress = progress
+        if message:
+            self.message = message
+        self.updated_at = time.time()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "error": self.error,
+            "result_available": self.result is not None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+class JobManager:
+    """Runs blocking pipeline functions on a bounded worker pool.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue_depth``
+    more may wait; ``submit`` raises QueueFullError beyond that so callers can
+    apply backpressure. Finished jobs are kept for ``history`` lookups, but
+    their results are not: a result is handed out once by ``take_result``, and
+    unread results are dropped after ``result_ttl`` seconds or, oldest first,
+    once all of them together exceed ``max_result_bytes``.
+    """
+
+    def __init__(self, max_workers: int, max_queue_depth: int, history: int = 1000, result_ttl: float = 600, max_result_bytes: int = 256 * 1024 * 1024):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.history = history
+        self.result_ttl = result_ttl
+        self.max_result_bytes = max_result_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._active = 0
+        self._result_bytes = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> Job:
+        job = Job(kind)
+        with self._lock:
+            if self._active >= self.max_workers + self.max_queue_depth:
+                raise QueueFullError(f"Job queue is full ({self._active} jobs pending)")
+            self._active += 1
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def take_result(self, job):
+        """Return a succeeded job's result and drop it; None once fetched or expired."""
+        with self._lock:
+            result = job.result
+            if result is not None:
+                self._drop_result(job, "fetched")
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"active": self._active, "capacity": self.max_workers + self.max_queue_depth, "result_bytes": self._result_bytes}
+
+    def _drop_result(self, job, reason):
+        self._result_bytes -= job.result_bytes
+        job.result = None
+        job.result_bytes = 0
+        job.result_dropped = reason
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - self.history)]:
+            if job.result is not None:
+                self._drop_result(job, "expired")
+            del self._jobs[job.id]
+
+        # Finished jobs are in submission order, close enough to finishing order for expiry
+        now = time.time()
+        for job in finished:
+            if job.result is not None and job.finished_at is not None and job.id in self._jobs:
+                if now - job.finished_at >= self.result_ttl or self._result_bytes > self.max_result_bytes:
+                    self._drop_result(job, "expired")
+
+    def _store_result(self, job, result):
+        # Sized as the JSON it is served as; inline base64 images dominate large results
+        job.result_bytes = len(json.dumps(result, default=str))
+        job.result = result
+        self._result_bytes += job.result_bytes
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        job.report(0.0, "Started")
+        try:
+            result = fn(*args, progress=job.report, **kwargs)
+            with self._lock:
+                self._store_result(job, result)
+            job.status = "succeeded"
+            job.report(1.0, "Done")
+        except HTTPException as e:
+            job.error = e.detail
+            job.status_code = e.status_code
+            job.status = "failed"
+            job.report(job.progress, "Failed")
+        except Exception as e:
+            job.error = str(e)
+            job.status_code = 500
+            job.status = "failed"
+            job.report(job.progress, "Failed")
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._active -= 1
+                self._prune()
@@ -0,0 +1,32 @@
+def table_cell(cell):
+    # Cells become single-line text; a literal "|" would end the cell early
+    if cell is None:
+        return ""
+    return " ".join(cell.split()).replace("|", "\\|")
+
+
+def rows_from_cells(cells, row_count=None, column_count=None):
+    """Group {"row", "column", "text"} cells into a row-major grid, filling gaps with ""."""
+    if row_count is None:
+        row_count = max((cell["row"] for cell in cells), default=-1) + 1
+    if column_count is None:
+        column_count = max((cell["column"] for cell in cells), default=-1) + 1
+    rows = [[""] * column_count for _ in range(row_count)]
+    for cell in cells:
+        rows[cell["row"]][cell["column"]] = cell["text"]
+    return rows
+
+
+def table_markdown(table):
+    """Render a {"page", "rows"} table as a markdown grid; the first row is used as the header row."""
+    title = f"### Table (Page {table['page']})\n\n" if table.get("page") is not None else "### Table\n\n"
+    rows = [[table_cell(cell) for cell in row] for row in table["rows"]]
+    if not rows:
+        return title
+    lines = [title]
+    lines.append("| " + " | ".join(rows[0]) + " |\n")
+    lines.append("|" + " --- |" * len(rows[0]) + "\n")
+    for row in rows[1:]:
+        lines.append("| " + " | ".join(row) + " |\n")
+    lines.append("\n")
+    return "".join(lines)
@@ -0,0 +1,191 @@
+import contextvars
+import cProfile
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans a cache hit up to a long Azure or Selenium run
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple((name, labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    # Same storage and samples as a counter, but it may also go down
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (not cumulative), sum, count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    return "".join(metric.render() for metric in _registry)
+
+
+stage_seconds = Histogram("pipeline_stage_seconds", "Time spent in each pipeline stage.", ("stage", "outcome"))
+stage_bytes = Counter("pipeline_stage_bytes_total", "Bytes going into and out of each pipeline stage.", ("stage", "direction"))
+stage_errors = Counter("pipeline_stage_errors_total", "Pipeline stage failures by exception type.", ("stage", "error"))
+stages_in_flight = Gauge("pipeline_stages_in_flight", "Pipeline stages currently running.", ("stage",))
+request_seconds = Histogram("http_request_seconds", "Time until the response headers are sent.", ("method", "route", "status"))
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+slow_requests = Counter("http_slow_requests_total", "Requests slower than the slow-request threshold.", ("method", "route"))
+
+# Set for the duration of a request that asked for a profile; contextvars follow run_in_threadpool
+_request_profile = contextvars.ContextVar("request_profile", default=None)
+_profiling = threading.local()
+
+
+def _profiled_call(fn, *args, **kwargs):
+    profiler = _request_profile.get()
+    # Only the outermost stage on a thread turns the profiler on
+    if profiler is None or getattr(_profiling, "active", False):
+        return fn(*args, **kwargs)
+    _profiling.active = True
+    profiler.enable()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        _profiling.active = False
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time a block as ``stage``; exceptions are counted by type and re-raised.
+
+    Yields a dict whose "outcome" the block can set to "error" for failures
+    that do not raise.
+    """
+    state = {"outcome": "ok"}
+    stages_in_flight.inc(stage=stage)
+    start = time.perf_counter()
+    try:
+        yield state
+    except Exception as e:
+        state["outcome"] = "error"
+        stage_errors.inc(stage=stage, error=type(e).__name__)
+        raise
+    finally:
+        stages_in_flight.dec(stage=stage)
+        stage_seconds.observe(time.perf_counter() - start, stage=stage, outcome=state["outcome"])
+
+
+def timed(stage: str, bytes_in=None, bytes_out=None, failed=None):
+    """Decorator recording each call as a pipeline stage.
+
+    ``bytes_in(*args, **kwargs)`` and ``bytes_out(result)`` return byte counts
+    for the stage; ``failed(result)`` marks results that signal an error
+    without raising (the scrapers' "Error ..." strings, Azure's None).
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if bytes_in is not None:
+                stage_bytes.inc(bytes_in(*args, **kwargs), stage=stage, direction="in")
+            with stage_timer(stage) as state:
+                result = _profiled_call(fn, *args, **kwargs)
+                if failed is not None and failed(result):
+                    state["outcome"] = "error"
+                    stage_errors.inc(stage=stage, error="ErrorResult")
+                elif bytes_out is not None:
+                    stage_bytes.inc(bytes_out(result), stage=stage, direction="out")
+            return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def request_profile(enabled: bool):
+    """Collect a cProfile of the instrumented stages run for this request."""
+    if not enabled:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    token = _request_profile.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _request_profile.reset(token)
@@ -1,76 +1,376 @@
-import io
+import os
 import fitz  # PyMuPDF
 import base64
-from PIL import Image
+import hashlib
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import HTTPException
 
-app = FastAPI()
+from markdownRender import table_markdown
+from metrics import timed
+from uploadSpool import pdf_source_size
 
-def extract_data(pdf_file_io: BytesIO):
+# Bump whenever the generated markdown changes so cached extractions are not reused
+EXTRACTOR_VERSION = "5"
+
+# Number of worker processes used for page-level extraction (1 = serial); one pool of
+# this size is shared by all requests
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+
+# Documents shorter than this are always extracted serially
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+
+# Images smaller than this many pixels on either side are treated as decorative and skipped
+PDF_MIN_IMAGE_SIDE = int(os.getenv("PDF_MIN_IMAGE_SIDE", "16"))
+
+# find_tables only runs on pages with at least this many distinct horizontal and vertical rulings
+# (a plain page border has two of each)
+PDF_TABLE_MIN_RULINGS = int(os.getenv("PDF_TABLE_MIN_RULINGS", "3"))
+
+# Content types for the image formats extract_image reports
+IMAGE_CONTENT_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "jpg": "image/jpeg",
+    "jpx": "image/jp2",
+    "jp2": "image/jp2",
+    "gif": "image/gif",
+    "bmp": "image/bmp",
+    "tiff": "image/tiff",
+    "jxr": "image/jxr",
+    "jb2": "image/x-jbig2",
+    "pnm": "image/x-portable-anymap",
+    "pam": "image/x-portable-arbitrarymap",
+    "psd": "image/vnd.adobe.photoshop"
+}
+
+# Formats browsers render from a data: URI; anything else is inlined as PNG
+INLINE_CONTENT_TYPES = {"image/png", "image/jpeg", "image/gif"}
+
+
+def _page_text(page, page_num):
+    return f"### Page {page_num + 1}\n\n" + page.get_text("text") + "\n\n"
+
+
+def _has_ruling_lines(page, min_rulings):
+    # Cheap pre-check on the vector drawings before the much slower find_tables
+    rows = set()
+    columns = set()
+    for path in page.get_cdrawings():
+        for item in path["items"]:
+            if item[0] == "re":
+                x0, y0, x1, y1 = item[1]
+                rows.update((round(y0), round(y1)))
+                columns.update((round(x0), round(x1)))
+            elif item[0] == "l":
+                (x0, y0), (x1, y1) = item[1], item[2]
+                if abs(y0 - y1) < 1:
+                    rows.add(round(y0))
+                elif abs(x0 - x1) < 1:
+                    columns.add(round(x0))
+        if len(rows) >= min_rulings and len(columns) >= min_rulings:
+            return True
+    return False
+
+
+def page_tables(page, page_num, min_rulings=None):
+    """Return the tables found on the page as {"page": n, "rows": [[cell, ...], ...]}."""
+    if min_rulings is None:
+        min_rulings = PDF_TABLE_MIN_RULINGS
+    if not _has_ruling_lines(page, min_rulings):
+        return []
+    tables = []
+    for table in page.find_tables().tables:
+        rows = table.extract()
+        if rows:
+            tables.append({"page": page_num + 1, "rows": rows})
+    return tables
+
+
+class ImageIndex:
+    """Document-level registry of embedded images, keyed by xref and content hash.
+
+    Each distinct image is extracted and kept once; later references only add
+    their page number to the first entry. Images smaller than ``min_side``
+    pixels on either side are treated as decorative and skipped.
+    """
+
+    def __init__(self, min_side: int = 0):
+        self.min_side = min_side
+        self.by_xref = {}
+        self.by_hash = {}
+        self.references = 0
+        self.filtered = 0
+
+    def add_page(self, doc, page, page_num):
+        """Return the images first seen on this page."""
+        page_images = []
+        image_list = page.get_images(full=True)
+        for img_index, img in enumerate(image_list):
+            xref, width, height = img[0], img[2], img[3]
+            self.references += 1
+            if width < self.min_side or height < self.min_side:
+                self.filtered += 1
+                continue
+
+            # Same xref: already extracted, nothing to decode
+            known = self.by_xref.get(xref)
+            if known is not None:
+                self._reference(known, page_num)
+                continue
+
+            base_image = doc.extract_image(xref)
+            ext = base_image["ext"]
+            sha256 = hashlib.sha256(base_image["image"]).hexdigest()
+
+            # Different xref, same bytes (the same logo embedded twice)
+            known = self.by_hash.get(sha256)
+            if known is not None:
+                self.by_xref[xref] = known
+                self._reference(known, page_num)
+                continue
+
+            # Keep the embedded bytes as they are; no decode, re-encode or base64 here
+            image = {
+                "filename": f"image_{page_num + 1}_{img_index + 1}.{ext}",
+                "ext": ext,
+                "content_type": IMAGE_CONTENT_TYPES.get(ext, "application/octet-stream"),
+                "data": base_image["image"],
+                "sha256": sha256,
+                "pages": [page_num + 1]
+            }
+            self.by_xref[xref] = image
+            self.by_hash[sha256] = image
+            page_images.append(image)
+        return page_images
+
+    def _reference(self, image, page_num):
+        if image["pages"][-1] != page_num + 1:
+            image["pages"].append(page_num + 1)
+
+    def merge(self, other):
+        """Fold in the index of a later page range; returns its images not already known."""
+        self.references += other.references
+        self.filtered += other.filtered
+        new_images = []
+        for image in other.by_hash.values():
+            known = self.by_hash.get(image["sha256"])
+            if known is None:
+                self.by_hash[image["sha256"]] = image
+                new_images.append(image)
+            else:
+                for page in image["pages"]:
+                    if page not in known["pages"]:
+                        known["pages"].append(page)
+        return new_images
+
+    def stats(self) -> dict:
+        kept = self.references - self.filtered
+        unique = len(self.by_hash)
+        return {
+            "references": self.references,
+            "filtered": self.filtered,
+            "unique": unique,
+            "duplicates": kept - unique,
+            "dedup_ratio": round(kept / unique, 2) if unique else 1.0
+        }
+
+
+def open_pdf(pdf_source):
+    # A path is read from disk by MuPDF as needed instead of being loaded into memory
+    if isinstance(pdf_source, (str, os.PathLike)):
+        return fitz.open(pdf_source, filetype="pdf")
+    return fitz.open(stream=pdf_source, filetype="pdf")
+
+
+def _extract_page(doc, page_num, image_index):
+    page = doc.load_page(page_num)
+    return _page_text(page, page_num), page_tables(page, page_num), image_index.add_page(doc, page, page_num)
+
+
+def _extract_range(doc, start, end, image_index):
+    texts = []
+    tables = []
+    images = []
+    for page_num in range(start, end):
+        page_text, page_tables, page_images = _extract_page(doc, page_num, image_index)
+        texts.append(page_text)
+        tables.extend(page_tables)
+        images.extend(page_images)
+    return texts, tables, images
+
+
+_extract_pools = {}
+_extract_pools_lock = threading.Lock()
+
+
+def _get_extract_pool(workers):
+    # Long-lived and spawned, not forked: the server is multi-threaded (uploader pools, boto3
+    # locks) and a forked child can inherit a lock held by another thread
+    with _extract_pools_lock:
+        pool = _extract_pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _extract_pools[workers] = pool
+        return pool
+
+
+def _extract_range_worker(pdf_path, start, end, min_side):
+    # Each worker reopens the document from disk for its page range
+    doc = open_pdf(pdf_path)
     try:
-        doc = fitz.open(stream=pdf_file_io, filetype="pdf")
-        
-        text_data = ""
-        tables = []
-        images = []
-        
-        for page_num in range(doc.page_count):
-            page = doc.load_page(page_num)
-            
-            text_data += f"### Page {page_num + 1}\n\n"
-            text_data += page.get_text("text") + "\n\n"
-            
-            image_list = page.get_images(full=True)
-            for img_index, img in enumerate(image_list):
-                xref = img[0]
-                base_image = doc.extract_image(xref)
-                image_bytes = base_image["image"]
-                img = Image.open(BytesIO(image_bytes))
-                img_filename = f"image_{page_num + 1}_{img_index + 1}.png"
-                
-                # Store image data directly instead of saving to file
-                buffered = BytesIO()
-                img.save(buffered, format="PNG")
-                img_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
-                images.append({
-                    "filename": img_filename,
-                    "base64": img_base64
-                })
-            
-            table = page.get_text("dict")
-            tables.append(table)
-        
+        image_index = ImageIndex(min_side)
+        texts, tables, _ = _extract_range(doc, start, end, image_index)
+        # Only the hash-keyed entries travel back; xrefs are merged by content
+        image_index.by_xref = {}
+        return texts, tables, image_index
+    finally:
+        doc.close()
+
+
+def _page_ranges(page_count, workers):
+    # A few ranges per worker keeps the pool busy when some pages are heavier
+    chunk_count = min(page_count, workers * 4)
+    chunk_size = -(-page_count // chunk_count)
+    return [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+
+
+def _extract_parallel(pdf_source, page_count, workers, image_index):
+    texts = []
+    tables = []
+    images = []
+    ranges = _page_ranges(page_count, workers)
+    spooled_path = None
+    if not isinstance(pdf_source, (str, os.PathLike)):
+        # Workers are shared across requests, so they get a path rather than a copy of the bytes per task
+        with tempfile.NamedTemporaryFile(prefix="extract-", suffix=".pdf", delete=False) as spool:
+            spool.write(pdf_source)
+        spooled_path = pdf_source = spool.name
+    executor = _get_extract_pool(workers)
+    futures = []
+    try:
+        futures = [executor.submit(_extract_range_worker, pdf_source, start, end, image_index.min_side) for start, end in ranges]
+        # Merge back in page order
+        for future in futures:
+            range_texts, range_tables, range_index = future.result()
+            texts.extend(range_texts)
+            tables.extend(range_tables)
+            images.extend(image_index.merge(range_index))
+    except BaseException:
+        # Ranges of a failed request that have not started yet do not hold up other requests
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        if spooled_path is not None:
+            os.remove(spooled_path)
+    return texts, tables, images
+
+
+@timed("extract_data", bytes_in=lambda pdf_source, *args, **kwargs: pdf_source_size(pdf_source))
+def extract_data(pdf_source, workers: int = None, min_image_side: int = None):
+    # pdf_source: a path to the PDF on disk, or its bytes in a BytesIO
+    try:
+        if workers is None:
+            workers = PDF_EXTRACT_WORKERS
+        if min_image_side is None:
+            min_image_side = PDF_MIN_IMAGE_SIDE
+
+        if isinstance(pdf_source, BytesIO):
+            pdf_source = pdf_source.getvalue()
+        doc = open_pdf(pdf_source)
+        image_index = ImageIndex(min_image_side)
+
+        if workers > 1 and doc.page_count >= PARALLEL_MIN_PAGES:
+            texts, tables, images = _extract_parallel(pdf_source, doc.page_count, workers, image_index)
+        else:
+            texts, tables, images = _extract_range(doc, 0, doc.page_count, image_index)
+
         return {
-            "text": text_data,
+            "text": "".join(texts),
             "tables": tables,
-            "images": images
+            "images": images,
+            "image_stats": image_index.stats()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def save_to_md(extracted_data):
+def _png_bytes(data):
+    pix = fitz.Pixmap(data)
+    if pix.colorspace is not None and pix.colorspace.n > 3:
+        # PNG has no CMYK
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    return pix.tobytes("png")
+
+
+def _image_markdown(img, inline_images):
+    if inline_images:
+        data, content_type = img["data"], img["content_type"]
+        if content_type not in INLINE_CONTENT_TYPES:
+            try:
+                data, content_type = _png_bytes(data), "image/png"
+            except Exception:
+                # Not decodable here; the linked form below still points at the uploaded original
+                return f"![{img['filename']}](../images/{img['filename']})\n"
+        img_base64 = base64.b64encode(data).decode("utf-8")
+        return f"![{img['filename']}](data:{content_type};base64,{img_base64})\n"
+    # Relative to the markdown/ folder the images are uploaded next to
+    return f"![{img['filename']}](../images/{img['filename']})\n"
+
+
+@timed("save_to_md", bytes_out=len)
+def save_to_md(extracted_data, inline_images=True):
     try:
-        markdown_content = "# Extracted Data from PDF\n\n"
-        
-        markdown_content += "## Extracted Text\n"
-        markdown_content += extracted_data["text"]
-        
-        markdown_content += "## Extracted Tables\n"
+        parts = ["# Extracted Data from PDF\n\n"]
+
+        parts.append("## Extracted Text\n")
+        parts.append(extracted_data["text"])
+
+        parts.append("## Extracted Tables\n")
         for table in extracted_data["tables"]:
-            markdown_content += "### Table\n"
-            for block in table["blocks"]:
-                if block['type'] == 0:
-                    for line in block["lines"]:
-                        line_text = " | ".join([span["text"] for span in line["spans"]])
-                        markdown_content += line_text + "\n"
-            markdown_content += "\n"
-        
-        markdown_content += "## Extracted Images\n"
+            parts.append(table_markdown(table))
+
+        parts.append("## Extracted Images\n")
         for img in extracted_data["images"]:
-            markdown_content += f"![{img['filename']}](data:image/png;base64,{img['base64']})\n"
-        
-        return markdown_content
+            parts.append(_image_markdown(img, inline_images))
+
+        return "".join(parts)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def stream_markdown(pdf_source, on_image=None, inline_images=True):
+    """Yield the same markdown as save_to_md(extract_data(...)), one page per section at a time.
+
+    Each section walks the document again so only a single page's text, tables or
+    images are alive at once. ``on_image`` is called with every extracted image
+    before its markdown chunk is yielded.
+    """
+    doc = open_pdf(pdf_source)
+    try:
+        yield "# Extracted Data from PDF\n\n"
+
+        yield "## Extracted Text\n"
+        for page_num in range(doc.page_count):
+            yield _page_text(doc.load_page(page_num), page_num)
+
+        yield "## Extracted Tables\n"
+        for page_num in range(doc.page_count):
+            for table in page_tables(doc.load_page(page_num), page_num):
+                yield table_markdown(table)
+
+        yield "## Extracted Images\n"
+        image_index = ImageIndex(PDF_MIN_IMAGE_SIDE)
+        for page_num in range(doc.page_count):
+            page = doc.load_page(page_num)
+            for img in image_index.add_page(doc, page, page_num):
+                if on_image:
+                    on_image(img)
+                yield _image_markdown(img, inline_images)
+                # The index only needs the metadata from here on
+                img["data"] = None
+    finally:
+        doc.close()
@@ -0,0 +1,127 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from metrics import timed
+
+
+class BatchUploadError(Exception):
+    def __init__(self, errors):
+        # errors: list of (s3_path, message) for every failed object in the batch
+        self.errors = errors
+        failed = ", ".join(f"{s3_path}: {message}" for s3_path, message in errors)
+        super().__init__(f"{len(errors)} upload(s) failed: {failed}")
+
+
+class S3Uploader:
+    """Thread-pool backed uploads sharing one S3 client.
+
+    Small bodies go out as a single ``put_object``; bodies at or above
+    ``multipart_threshold`` use the managed transfer, which splits them into
+    concurrent multipart uploads. Size ``max_workers`` to match the client's
+    ``max_pool_connections`` so workers never wait for a connection.
+    """
+
+    def __init__(self, s3_client, bucket: str, max_workers: int = 16, multipart_threshold: int = 8 * 1024 * 1024):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.multipart_threshold = multipart_threshold
+        self.max_workers = max_workers
+        self._transfer_config = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def transfer_config(self):
+        # Built on the first multipart upload; importing boto3's transfer module is slow
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+
+            self._transfer_config = TransferConfig(
+                multipart_threshold=self.multipart_threshold,
+                multipart_chunksize=self.multipart_threshold,
+                max_concurrency=self.max_workers
+            )
+        return self._transfer_config
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="s3-upload")
+            return self._executor
+
+    @timed("s3_upload", bytes_in=lambda self, body, *args, **kwargs: len(body))
+    def upload(self, body: bytes, folder: str, filename: str, content_type: str) -> str:
+        s3_path = f"{folder}/{filename}"
+        if len(body) >= self.multipart_threshold:
+            self.s3_client.upload_fileobj(
+                io.BytesIO(body),
+                self.bucket,
+                s3_path,
+                ExtraArgs={"ContentType": content_type},
+                Config=self.transfer_config
+            )
+        else:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=s3_path,
+                Body=body,
+                ContentType=content_type
+            )
+        return s3_path
+
+    def submit(self, body: bytes, folder: str, filename: str, content_type: str):
+        future = self.executor.submit(self.upload, body, folder, filename, content_type)
+        future.s3_path = f"{folder}/{filename}"
+        return future
+
+    @timed("s3_upload", bytes_in=lambda self, path, *args, **kwargs: os.path.getsize(path))
+    def upload_file(self, path: str, folder: str, filename: str, content_type: str) -> str:
+        # Streamed from disk part by part; the file is never read into memory as a whole
+        s3_path = f"{folder}/{filename}"
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size >= self.multipart_threshold:
+                self.s3_client.upload_fileobj(
+                    file,
+                    self.bucket,
+                    s3_path,
+                    ExtraArgs={"ContentType": content_type},
+                    Config=self.transfer_config
+                )
+            else:
+                self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=s3_path,
+                    Body=file,
+                    ContentType=content_type
+                )
+        return s3_path
+
+    def submit_file(self, path: str, folder: str, filename: str, content_type: str):
+        future = self.executor.submit(self.upload_file, path, folder, filename, content_type)
+        future.s3_path = f"{folder}/{filename}"
+        return future
+
+    def upload_batch(self, items, pending=()) -> list:
+        """Upload (body, folder, filename, content_type) items concurrently.
+
+        Futures from earlier ``submit`` calls can be joined through ``pending``.
+        Every upload is allowed to finish; failures are collected and raised
+        together as a BatchUploadError. Returns the S3 paths in item order.
+        """
+        futures = list(pending) + [self.submit(*item) for item in items]
+        wait(futures)
+
+        errors = []
+        s3_paths = []
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                errors.append((future.s3_path, str(error)))
+            else:
+                s3_paths.append(future.result())
+        if errors:
+            raise BatchUploadError(errors)
+        return s3_paths[len(pending):]
@@ -0,0 +1,133 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from htmlMarkdown import html_to_markdown
+from metrics import stage_timer
+from scrapingBee import HEADERS
+
+
+def content_fingerprint(html: str) -> str:
+    # Hash of the page's markdown with whitespace collapsed, so markup-only churn
+    # (script nonces, attribute order, reformatting) does not count as a change
+    markdown_content, images = html_to_markdown(html)
+    hasher = hashlib.sha256(" ".join(markdown_content.split()).encode())
+    for img_url in images:
+        hasher.update(b"\n" + img_url.encode())
+    return hasher.hexdigest()
+
+
+class ScrapeCache:
+    """Per-URL, per-method record of the last full scrape, used to skip re-scraping unchanged pages.
+
+    Each entry keeps the origin's validators (ETag / Last-Modified), a
+    fingerprint of the page's normalized content and the S3 paths of what was
+    uploaded. Each scraping method has its own entries, since each stores its
+    result in its own S3 folder. ``probe`` fetches the URL directly with a conditional GET: a 304,
+    or a 200 whose fingerprint matches, means the stored result is still
+    current. Entries live for ``ttl`` seconds after their full scrape (or the
+    ``ttl`` given to ``put``), after which the page is scraped again
+    regardless; beyond ``max_entries`` the least recently used are evicted.
+
+    Rendered pages (``rendered=True``) are only probed with a conditional
+    HEAD and only a 304 counts as unchanged: a plain fetch sees the static
+    shell, which can stay identical while the JavaScript-rendered content
+    changes. Even a 304 can miss such changes, so rendered entries should be
+    given a short ``ttl``.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 86400, timeout: float = 10, pool_size: int = 16):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"not_modified": 0, "unchanged": 0, "changed": 0, "misses": 0, "probe_errors": 0, "expirations": 0, "evictions": 0}
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, url: str, method: str):
+        key = (method, url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry["scraped_at"] >= entry["ttl"]:
+                del self._entries[key]
+                self.stats["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def probe(self, url: str, entry=None, rendered: bool = False) -> dict:
+        """Conditional GET (HEAD when ``rendered``) of ``url`` against ``entry``.
+
+        Returns {"status": "not_modified" | "unchanged" | "changed" | "error",
+        "validators", "fingerprint"}; validators and fingerprint describe the
+        page as just fetched and are what ``put`` should store after a full
+        scrape. Rendered pages get no fingerprint and are never "unchanged".
+        """
+        headers = dict(HEADERS)
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            with stage_timer("scrape_cache_probe"):
+                # The body of a rendered page's shell says nothing about its content, so it is not fetched
+                request = self.session.head if rendered else self.session.get
+                response = request(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        except requests.exceptions.RequestException:
+            self._count("probe_errors")
+            return {"status": "error", "validators": {"etag": None, "last_modified": None}, "fingerprint": None}
+
+        if response.status_code == 304 and entry is not None:
+            self._count("not_modified")
+            return {"status": "not_modified", "validators": {"etag": entry["etag"], "last_modified": entry["last_modified"]}, "fingerprint": entry["fingerprint"]}
+
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        if response.status_code != 200:
+            # Blocked or failing for a plain client; the scraper may still get through
+            self._count("probe_errors")
+            return {"status": "error", "validators": {"etag": None, "last_modified": None}, "fingerprint": None}
+
+        fingerprint = None if rendered else content_fingerprint(response.text)
+        if fingerprint is not None and entry is not None and entry["fingerprint"] == fingerprint:
+            self._count("unchanged")
+            return {"status": "unchanged", "validators": validators, "fingerprint": fingerprint}
+
+        self._count("changed" if entry is not None else "misses")
+        return {"status": "changed", "validators": validators, "fingerprint": fingerprint}
+
+    def put(self, url: str, method: str, validators: dict, fingerprint: str, s3_paths: dict, image_stats: dict, scraped_at: float = None, ttl: float = None) -> None:
+        entry = {
+            "etag": validators["etag"],
+            "last_modified": validators["last_modified"],
+            "fingerprint": fingerprint,
+            "s3_paths": s3_paths,
+            "image_stats": image_stats,
+            "scraped_at": time.time() if scraped_at is None else scraped_at,
+            "ttl": self.ttl if ttl is None else ttl
+        }
+        with self._lock:
+            self._entries.pop((method, url), None)
+            self._entries[(method, url)] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries))
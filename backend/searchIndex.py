@@ -0,0 +1,207 @@
+import re
+import sqlite3
+import threading
+import time
+
+from metrics import timed
+
+HEADING = re.compile(r"^#{1,6}\s+(.*?)\s*$")
+
+# "### Page 3" and "### Table (Page 3)" headings carry the page number
+PAGE_IN_TITLE = re.compile(r"\bPage (\d+)\b")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    s3_key TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    name TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    page INTEGER,
+    title TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_document ON sections(document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+    title, text, content='sections', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS sections_insert AFTER INSERT ON sections BEGIN
+    INSERT INTO sections_fts(rowid, title, text) VALUES (new.id, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS sections_delete AFTER DELETE ON sections BEGIN
+    INSERT INTO sections_fts(sections_fts, rowid, title, text) VALUES ('delete', old.id, old.title, old.text);
+END;
+"""
+
+
+class SectionSplitter:
+    """Split markdown into {"page", "title", "text"} sections, fed a chunk at a time.
+
+    A new section starts at every heading; a heading that names a page sets
+    the section's page. Image lines (inline base64 or links) are dropped, so
+    only text is kept while a streamed document passes through. With
+    ``split_at_headings=False`` the whole document is one section.
+    """
+
+    def __init__(self, split_at_headings: bool = True):
+        self.split_at_headings = split_at_headings
+        self.sections = []
+        self._partial = ""
+        self._title = None
+        self._page = None
+        self._lines = []
+
+    def feed(self, chunk: str) -> None:
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, line):
+        if line.startswith("!["):
+            return
+        heading = HEADING.match(line) if self.split_at_headings else None
+        if heading is None:
+            self._lines.append(line)
+            return
+        self._flush()
+        self._title = heading.group(1)
+        page = PAGE_IN_TITLE.search(self._title)
+        self._page = int(page.group(1)) if page else None
+
+    def _flush(self):
+        text = "\n".join(self._lines).strip()
+        if text:
+            self.sections.append({"page": self._page, "title": self._title, "text": text})
+        self._lines = []
+
+    def close(self) -> list:
+        if self._partial:
+            self._add_line(self._partial)
+            self._partial = ""
+        self._flush()
+        return self.sections
+
+
+def markdown_sections(markdown_content: str, split_at_headings: bool = True) -> list:
+    splitter = SectionSplitter(split_at_headings)
+    splitter.feed(markdown_content)
+    return splitter.close()
+
+
+def match_query(query: str) -> str:
+    # Plain words are ANDed together as quoted terms, so user input never hits FTS5 syntax errors;
+    # a trailing * keeps prefix matching
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """SQLite FTS5 index over extracted markdown, one row per page or section.
+
+    Each document is keyed by the S3 key of its markdown; indexing the same
+    key again replaces its sections. Results are ranked by bm25 with titles
+    weighted above body text. Every thread gets its own connection; writes
+    are serialized and WAL mode keeps searches from waiting on them.
+    """
+
+    def __init__(self, path: str, title_weight: float = 5.0):
+        self.path = path
+        self.title_weight = title_weight
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @timed("search_index", bytes_in=lambda self, s3_key, source, sections, *args, **kwargs: sum(len(section["text"]) for section in sections))
+    def index_document(self, s3_key: str, source: str, sections, name: str = None) -> int:
+        """Replace the document stored under ``s3_key`` with ``sections``; returns the section count."""
+        connection = self._connection()
+        with self._write_lock, connection:
+            row = connection.execute("SELECT id FROM documents WHERE s3_key = ?", (s3_key,)).fetchone()
+            if row is not None:
+                connection.execute("DELETE FROM sections WHERE document_id = ?", (row[0],))
+                connection.execute("UPDATE documents SET source = ?, name = ?, indexed_at = ? WHERE id = ?", (source, name, time.time(), row[0]))
+                document_id = row[0]
+            else:
+                document_id = connection.execute(
+                    "INSERT INTO documents (s3_key, source, name, indexed_at) VALUES (?, ?, ?, ?)", (s3_key, source, name, time.time())
+                ).lastrowid
+            connection.executemany(
+                "INSERT INTO sections (document_id, page, title, text) VALUES (?, ?, ?, ?)",
+                [(document_id, section["page"], section["title"], section["text"]) for section in sections]
+            )
+        return len(sections)
+
+    def _ranked(self, columns, expression, source, extra_where="", extra_params=(), limit=None, offset=None):
+        sql = f"SELECT {columns} FROM sections_fts"
+        # Joining every match costs as much as ranking it; skip it when only rowids are needed
+        if source or columns != "sections_fts.rowid":
+            sql += " JOIN sections s ON s.id = sections_fts.rowid JOIN documents d ON d.id = s.document_id"
+        sql += f" WHERE sections_fts MATCH ?{extra_where}"
+        params = [expression, *extra_params]
+        if source:
+            # Folder prefix, e.g. "pdf_extraction" or "web_scraping/selenium"
+            sql += " AND (d.source = ? OR d.source LIKE ? ESCAPE '\\')"
+            params += [source, source.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "/%"]
+        if limit is not None:
+            sql += f" ORDER BY bm25(sections_fts, {self.title_weight}, 1.0) LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return self._connection().execute(sql, params).fetchall()
+
+    def search(self, query: str, source: str = None, limit: int = 20, offset: int = 0) -> dict:
+        """Best matches first, ``limit`` per page; ``next_offset`` is None on the last page."""
+        expression = match_query(query)
+        columns = (
+            "sections_fts.rowid, d.s3_key, d.source, d.name, s.page, s.title,"
+            f" snippet(sections_fts, 1, '**', '**', '...', 16), bm25(sections_fts, {self.title_weight}, 1.0)"
+        )
+        # One extra row tells whether there is a next page without counting every match
+        rows = []
+        if expression and "*" in expression:
+            # Re-running a prefix query to build snippets costs more than building them for every match
+            rows = self._ranked(columns, expression, source, limit=limit + 1, offset=offset)
+        elif expression:
+            # Rank first and build snippets only for the rows on this page; a common term
+            # matches most sections and snippets for all of them would dominate the query
+            section_ids = [row[0] for row in self._ranked("sections_fts.rowid", expression, source, limit=limit + 1, offset=offset)]
+            if section_ids:
+                placeholders = ", ".join("?" * len(section_ids))
+                by_id = {row[0]: row for row in self._ranked(columns, expression, None, f" AND sections_fts.rowid IN ({placeholders})", section_ids)}
+                rows = [by_id[section_id] for section_id in section_ids if section_id in by_id]
+
+        results = [
+            {"s3_key": s3_key, "source": source_folder, "name": name, "page": page, "title": title, "snippet": snippet, "score": -score}
+            for _, s3_key, source_folder, name, page, title, snippet, score in rows
+        ]
+        has_more = len(results) > limit
+        return {
+            "query": query,
+            "results": results[:limit],
+            "offset": offset,
+            "limit": limit,
+            "next_offset": offset + limit if has_more else None
+        }
+
+    def stats(self) -> dict:
+        connection = self._connection()
+        documents = connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        sections = connection.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+        return {"documents": documents, "sections": sections}
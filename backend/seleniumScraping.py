@@ -1,3 +1,5 @@
+import os
+from functools import lru_cache
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -7,67 +9,191 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 import requests
 
-def selenium_scraping(url):
+from metrics import stage_timer, timed
+
+SELENIUM_EXTRACTION_MODE = os.getenv("SELENIUM_EXTRACTION_MODE", "script")
+
+# Fast-load mode: eager page loads with heavy resources and tracker domains blocked
+SELENIUM_FAST_LOAD = os.getenv("SELENIUM_FAST_LOAD", "false").lower() == "true"
+
+# Resource kinds blocked in fast-load mode (image, media, font, stylesheet). Stylesheets
+# are left on by default because they decide which elements are visible.
+SELENIUM_BLOCKED_RESOURCES = [kind.strip() for kind in os.getenv("SELENIUM_BLOCKED_RESOURCES", "image,media,font").split(",") if kind.strip()]
+
+# Extra URL patterns blocked in fast-load mode, e.g. "*google-analytics.com*,*doubleclick.net*"
+SELENIUM_BLOCKED_URLS = [pattern.strip() for pattern in os.getenv("SELENIUM_BLOCKED_URLS", "").split(",") if pattern.strip()]
+
+# When a page counts as loaded: "body", "interactive", "complete" or "css:<selector>"
+SELENIUM_READY_CONDITION = os.getenv("SELENIUM_READY_CONDITION", "body")
+SELENIUM_READY_TIMEOUT = float(os.getenv("SELENIUM_READY_TIMEOUT", "20"))
+
+RESOURCE_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"],
+    "media": ["mp4", "webm", "ogg", "mp3", "wav", "m4a", "mov", "m3u8"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "stylesheet": ["css"]
+}
+
+
+@lru_cache(maxsize=None)
+def resolve_driver_path():
+    # ChromeDriverManager checks (and may download) the driver; do it once per process
+    return ChromeDriverManager().install()
+
+
+def chrome_options(fast_load=None):
     # Set up Chrome options
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
+    if fast_load is None:
+        fast_load = SELENIUM_FAST_LOAD
+    if fast_load:
+        # Return from get() at DOMContentLoaded instead of waiting for every subresource
+        chrome_options.page_load_strategy = "eager"
+        if "image" in SELENIUM_BLOCKED_RESOURCES:
+            # Catches images without a telltale extension; src attributes are still readable
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return chrome_options
 
-    try:
-        # Set up the Chrome driver
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
 
+def blocked_url_patterns(resources=None, extra_patterns=None):
+    resources = SELENIUM_BLOCKED_RESOURCES if resources is None else resources
+    extra_patterns = SELENIUM_BLOCKED_URLS if extra_patterns is None else extra_patterns
+    patterns = []
+    for kind in resources:
+        for extension in RESOURCE_EXTENSIONS.get(kind, []):
+            patterns.extend([f"*.{extension}", f"*.{extension}?*"])
+    return patterns + list(extra_patterns)
+
+
+def _enable_fast_load(driver):
+    # Blocked URLs stick to the browser session, so pooled drivers only need this once
+    if getattr(driver, "_fast_load_enabled", False):
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns()})
+    driver._fast_load_enabled = True
+
+
+def _ready_condition(condition):
+    if condition == "interactive":
+        return lambda driver: driver.execute_script("return document.readyState") in ("interactive", "complete")
+    if condition == "complete":
+        return lambda driver: driver.execute_script("return document.readyState") == "complete"
+    if condition.startswith("css:"):
+        return EC.presence_of_element_located((By.CSS_SELECTOR, condition[len("css:"):]))
+    return EC.presence_of_element_located((By.TAG_NAME, "body"))
+
+
+# One round trip: everything the markdown needs, in document order.
+# Elements that are not rendered report "" like WebElement.text does, and
+# href/src resolve to absolute URLs like get_attribute does.
+EXTRACT_PAGE_SCRIPT = """
+const shownText = el => el.getClientRects().length ? el.innerText.trim() : "";
+const resolved = (el, name) => el.getAttribute(name) === null ? null : el[name];
+return {
+    text: Array.from(document.querySelectorAll("h1, h2, h3, p"), shownText),
+    tables: Array.from(document.querySelectorAll("table"), table =>
+        Array.from(table.querySelectorAll("tr"), row => Array.from(row.querySelectorAll("td"), shownText))
+    ),
+    links: Array.from(document.querySelectorAll("a"), link => [resolved(link, "href"), shownText(link)]),
+    images: Array.from(document.querySelectorAll("img"), image => resolved(image, "src"))
+};
+"""
+
+
+def _collect_with_script(driver):
+    return driver.execute_script(EXTRACT_PAGE_SCRIPT)
+
+
+def _collect_with_elements(driver):
+    # One WebDriver round trip per element and attribute
+    return {
+        "text": [element.text for element in driver.find_elements(By.XPATH, "//h1 | //h2 | //h3 | //p")],
+        "tables": [
+            [[col.text for col in row.find_elements(By.TAG_NAME, "td")] for row in table.find_elements(By.TAG_NAME, "tr")]
+            for table in driver.find_elements(By.TAG_NAME, "table")
+        ],
+        "links": [[link.get_attribute("href"), link.text] for link in driver.find_elements(By.TAG_NAME, "a")],
+        "images": [image.get_attribute("src") for image in driver.find_elements(By.TAG_NAME, "img")]
+    }
+
+
+def build_markdown(url, page_data):
+    markdown_content = [f"# Extracted Content from {url}\n\n"]
+    image_urls = []
+
+    # Extract and save text content (headings and paragraphs)
+    markdown_content.append("## Text Content\n\n")
+    for text in page_data["text"]:
+        markdown_content.append(f"{text.strip()}\n\n")
+
+    # Extract and save tables
+    markdown_content.append("## Tables\n\n")
+    for table_index, rows in enumerate(page_data["tables"], start=1):
+        markdown_content.append(f"### Table {table_index}\n\n")
+        for row in rows:
+            row_data = [col.strip() for col in row]
+            markdown_content.append("| " + " | ".join(row_data) + " |\n")
+        markdown_content.append("\n")
+
+    # Extract and save links
+    markdown_content.append("## Links\n\n")
+    for href, text in page_data["links"]:
+        if href:
+            markdown_content.append(f"- [{text}]({href})\n")
+    markdown_content.append("\n")
+
+    # Extract and save images
+    markdown_content.append("## Images\n\n")
+    for index, img_url in enumerate(page_data["images"], start=1):
+        if img_url:
+            image_urls.append(img_url)
+            markdown_content.append(f"![Image {index}]({img_url})\n")
+
+    return "".join(markdown_content), image_urls
+
+
+def _scrape_with_driver(driver, url, mode, fast_load=None, ready_condition=None):
+    if fast_load is None:
+        fast_load = SELENIUM_FAST_LOAD
+    if fast_load:
+        _enable_fast_load(driver)
+
+    with stage_timer("selenium_page_load"):
         driver.get(url)
 
-        # Wait for the page to load completely
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-
-        markdown_content = f"# Extracted Content from {url}\n\n"
-        image_urls = []
-
-        # Extract and save text content (headings and paragraphs)
-        markdown_content += "## Text Content\n\n"
-        elements = driver.find_elements(By.XPATH, "//h1 | //h2 | //h3 | //p")
-        for element in elements:
-            markdown_content += f"{element.text.strip()}\n\n"
-
-        # Extract and save tables
-        markdown_content += "## Tables\n\n"
-        tables = driver.find_elements(By.TAG_NAME, "table")
-        for table_index, table in enumerate(tables, start=1):
-            markdown_content += f"### Table {table_index}\n\n"
-            rows = table.find_elements(By.TAG_NAME, "tr")
-            for row in rows:
-                columns = row.find_elements(By.TAG_NAME, "td")
-                row_data = [col.text.strip() for col in columns]
-                markdown_content += "| " + " | ".join(row_data) + " |\n"
-            markdown_content += "\n"
-
-        # Extract and save links
-        markdown_content += "## Links\n\n"
-        links = driver.find_elements(By.TAG_NAME, "a")
-        for link in links:
-            href = link.get_attribute("href")
-            if href:
-                markdown_content += f"- [{link.text}]({href})\n"
-        markdown_content += "\n"
-
-        # Extract and save images
-        markdown_content += "## Images\n\n"
-        images = driver.find_elements(By.TAG_NAME, "img")
-        for index, image in enumerate(images, start=1):
-            img_url = image.get_attribute("src")
-            if img_url:
-                image_urls.append(img_url)
-                markdown_content += f"![Image {index}]({img_url})\n"
-
-        return markdown_content, image_urls
+        # Wait until the content we read is there
+        WebDriverWait(driver, SELENIUM_READY_TIMEOUT).until(_ready_condition(ready_condition or SELENIUM_READY_CONDITION))
 
-    except Exception as e:
-        return f"Error during scraping: {str(e)}", []
+    page_data = _collect_with_elements(driver) if mode == "elements" else _collect_with_script(driver)
+    return build_markdown(url, page_data)
+
+
+@timed("selenium_scraping", failed=lambda result: result[0].startswith("Error"), bytes_out=lambda result: len(result[0]))
+def selenium_scraping(url, pool=None, mode=None):
+    """Scrape ``url`` with a driver checked out of ``pool``, or a throwaway driver if no pool is given.
+
+    ``mode`` is "script" (one execute_script call per page) or "elements"
+    (the original per-element WebDriver calls); defaults to SELENIUM_EXTRACTION_MODE.
+    With SELENIUM_FAST_LOAD the page loads eagerly with heavy resources blocked
+    and is read once SELENIUM_READY_CONDITION holds.
+    """
+    mode = mode or SELENIUM_EXTRACTION_MODE
+    try:
+        if pool is not None:
+            with pool.driver() as driver:
+                return _scrape_with_driver(driver, url, mode)
 
-    finally:
-        if 'driver' in locals():
+        # Set up the Chrome driver
+        service = Service(resolve_driver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options())
+        try:
+            return _scrape_with_driver(driver, url, mode)
+        finally:
             driver.quit()
+
+    except Exception as e:
+        return f"Error during scraping: {str(e)}", []
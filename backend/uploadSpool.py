@@ -0,0 +1,96 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+
+from metrics import stage_bytes, stage_timer
+
+
+def pdf_source_size(pdf_source) -> int:
+    # Extractors take a path on disk, raw bytes or a BytesIO
+    if isinstance(pdf_source, (str, os.PathLike)):
+        return os.path.getsize(pdf_source)
+    if isinstance(pdf_source, io.BytesIO):
+        return pdf_source.getbuffer().nbytes
+    return len(pdf_source)
+
+
+class SpooledUpload:
+    """An uploaded file spooled to disk, with the SHA-256 of its content.
+
+    Extractors open ``path`` directly and S3 uploads stream from it, so the
+    body is never held in memory as a whole. ``release`` deletes the file,
+    deferred until every future passed to ``keep_until`` (e.g. a background
+    S3 upload still reading it) is done.
+    """
+
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self._readers = []
+        self._released = False
+        self._lock = threading.Lock()
+
+    def keep_until(self, future):
+        self._readers.append(future)
+        return future
+
+    def _remove(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def release(self):
+        readers = [future for future in self._readers if not future.done()]
+        if not readers:
+            self._remove()
+            return
+        remaining = [len(readers)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._remove()
+
+        for future in readers:
+            future.add_done_callback(on_done)
+
+
+async def spool_upload(file, directory: str = None, chunk_size: int = 1024 * 1024) -> SpooledUpload:
+    """Copy an UploadFile to a temp file chunk by chunk, hashing as it goes."""
+    hasher = hashlib.sha256()
+    size = 0
+    with stage_timer("upload_read"):
+        spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=".pdf", dir=directory, delete=False)
+        try:
+            with spool:
+                while True:
+                    chunk = await file.read(chunk_size)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    spool.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(spool.name)
+            raise
+    stage_bytes.inc(size, stage="upload_read", direction="in")
+    return SpooledUpload(spool.name, file.filename, size, hasher.hexdigest())
+
+
+def spool_bytes(data: bytes, filename: str, directory: str = None) -> SpooledUpload:
+    """Spool an in-memory body, for callers that already hold the whole file."""
+    with tempfile.NamedTemporaryFile(prefix="upload-", suffix=".pdf", dir=directory, delete=False) as spool:
+        spool.write(data)
+    return SpooledUpload(spool.name, filename, len(data), hashlib.sha256(data).hexdigest())
@@ -0,0 +1,104 @@
+"""Whole-document vs. chunked Azure layout analysis against a local fake client.
+
+The fake analyzes with fitz and sleeps ``--base-latency`` plus
+``--page-latency`` per page before the poller returns, like the service does
+for bigger documents. Every page carries one table so stitched page numbers
+can be checked against the whole-document run.
+
+Usage: python bench/bench_azure_chunks.py [--pages 200] [--chunk-pages 25] [--in-flight 1 4 8]
+"""
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+os.environ.setdefault("AZURE_ENDPOINT_URL", "https://example.cognitiveservices.azure.com/")
+os.environ.setdefault("AZURE_KEY_API", "bench")
+
+import fitz  # PyMuPDF
+
+from azurePdfScraping import extract_pdf_data
+from bench_parallel_extract import build_pdf
+
+
+class FakePoller:
+    def __init__(self, client, result, latency):
+        self.client = client
+        self._result = result
+        self.latency = latency
+
+    def result(self):
+        time.sleep(self.latency)
+        with self.client.lock:
+            self.client.in_flight -= 1
+        return self._result
+
+
+class FakeAnalysisClient:
+    """Stands in for DocumentAnalysisClient.begin_analyze_document."""
+
+    def __init__(self, base_latency, page_latency):
+        self.base_latency = base_latency
+        self.page_latency = page_latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+
+    def begin_analyze_document(self, model_id, document):
+        doc = fitz.open(stream=document.read(), filetype="pdf")
+        pages = []
+        tables = []
+        for page in doc:
+            page_number = page.number + 1
+            lines = [SimpleNamespace(content=line) for line in page.get_text("text").splitlines() if line.strip()]
+            pages.append(SimpleNamespace(page_number=page_number, lines=lines))
+            cells = [SimpleNamespace(row_index=0, column_index=0, content=f"first line: {lines[0].content if lines else ''}")]
+            tables.append(SimpleNamespace(cells=cells, bounding_regions=[SimpleNamespace(page_number=page_number)]))
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        latency = self.base_latency + self.page_latency * doc.page_count
+        return FakePoller(self, SimpleNamespace(pages=pages, tables=tables), latency)
+
+
+def run(pdf_bytes, args, chunk_pages, in_flight):
+    client = FakeAnalysisClient(args.base_latency, args.page_latency)
+    start = time.perf_counter()
+    extracted_data = extract_pdf_data(io.BytesIO(pdf_bytes), chunk_pages=chunk_pages, max_in_flight=in_flight, client=client)
+    return time.perf_counter() - start, extracted_data, client
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--chunk-pages", type=int, default=25)
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--base-latency", type=float, default=1.0)
+    parser.add_argument("--page-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    pdf_bytes = build_pdf(args.pages)
+    baseline_time, baseline, _ = run(pdf_bytes, args, 0, 1)
+    print(f"whole document: {baseline_time:.2f}s")
+
+    for in_flight in args.in_flight:
+        elapsed, extracted_data, client = run(pdf_bytes, args, args.chunk_pages, in_flight)
+        same_pages = extracted_data["pages"] == baseline["pages"]
+        same_tables = extracted_data["tables"] == baseline["tables"]
+        print(
+            f"chunks of {args.chunk_pages}, in_flight={in_flight}: {elapsed:.2f}s ({baseline_time / elapsed:.2f}x) "
+            f"calls={client.calls} peak_in_flight={client.peak_in_flight} same_pages={same_pages} same_tables={same_tables}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""URLs per second for BatchCrawler against a local stand-in HTTP server vs. a serial requests loop.
+
+Every URL goes to the same local host, so ``--per-host`` is the effective cap.
+``--latency`` is added to each response to stand in for a remote site. The
+POST /web/scrape/batch endpoint is then timed end to end, including the S3
+upload (an in-memory stub with ``--s3-latency`` per request) and search index
+write of every page.
+
+Usage: python bench/bench_batch_crawl.py [--urls 2000] [--per-host 32] [--s3-latency 0.02]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+os.environ.setdefault("S3_REGION", "us-east-1")
+os.environ.setdefault("S3_BUCKET_NAME", "bench")
+os.environ.setdefault("SELENIUM_POOL_SIZE", "0")
+
+import requests
+
+from batchCrawler import BatchCrawler
+from fixture_server import article_page, serve
+from s3stub import StubS3, install
+from scrapingBee import html_to_markdown
+
+
+def serial_loop(urls):
+    for url in urls:
+        html_to_markdown(requests.get(url).text)
+
+
+async def batch(urls, global_limit, per_host_limit):
+    crawler = BatchCrawler(global_limit=global_limit, per_host_limit=per_host_limit)
+    return [result async for result in crawler.crawl(urls)]
+
+
+def endpoint(urls, global_limit, per_host_limit, s3_latency):
+    from fastapi.testclient import TestClient
+
+    import app as backend
+
+    backend.BATCH_GLOBAL_CONCURRENCY = global_limit
+    backend.BATCH_PER_HOST_CONCURRENCY = per_host_limit
+    stub = StubS3(latency=s3_latency)
+    install(backend, stub)
+    with TestClient(backend.app) as client:
+        with client.stream("POST", "/web/scrape/batch", json={"urls": urls, "method": "Direct"}) as response:
+            return [json.loads(line) for line in response.iter_lines() if line], stub.requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=2000)
+    parser.add_argument("--serial-urls", type=int, default=200)
+    parser.add_argument("--global-limit", type=int, default=64)
+    parser.add_argument("--per-host", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--s3-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    pages = {f"/page/{index}": (article_page(index, paragraphs=20, links=40, images=5), "text/html") for index in range(100)}
+    base_url, _ = serve(pages, latency=args.latency)
+    urls = [f"{base_url}/page/{index % 100}" for index in range(args.urls)]
+
+    start = time.perf_counter()
+    serial_loop(urls[:args.serial_urls])
+    elapsed = time.perf_counter() - start
+    print(f"serial requests.get: {args.serial_urls / elapsed:.1f} URLs/s")
+
+    start = time.perf_counter()
+    results = asyncio.run(batch(urls, args.global_limit, args.per_host))
+    elapsed = time.perf_counter() - start
+    failures = sum(1 for result in results if result.get("status") != 200)
+    print(f"BatchCrawler: {len(results) / elapsed:.1f} URLs/s failures={failures}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["SEARCH_INDEX_PATH"] = os.path.join(directory, "search.db")
+        start = time.perf_counter()
+        results, s3_requests = endpoint(urls, args.global_limit, args.per_host, args.s3_latency)
+        elapsed = time.perf_counter() - start
+    failures = sum(1 for result in results if "s3_path" not in result)
+    print(f"/web/scrape/batch: {len(results) / elapsed:.1f} URLs/s failures={failures} s3_requests={s3_requests}")
+
+
+if __name__ == "__main__":
+    main()
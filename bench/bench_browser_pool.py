@@ -0,0 +1,53 @@
+"""Page throughput of selenium_scraping with a warm BrowserPool vs. a fresh driver per request.
+
+Needs a local Chrome. Pages are served from a local fixture server.
+
+Usage: python bench/bench_browser_pool.py [--pages 30] [--pool-size 2]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+from browserPool import BrowserPool
+from fixture_server import article_page, serve
+from seleniumScraping import chrome_options, resolve_driver_path, selenium_scraping
+
+
+def run(urls, pool, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda url: selenium_scraping(url, pool=pool), urls))
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for markdown_content, _ in results if markdown_content.startswith("Error"))
+    return elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    base_url, _ = serve({f"/page/{index}": (article_page(index), "text/html") for index in range(args.pages)})
+    urls = [f"{base_url}/page/{index}" for index in range(args.pages)]
+    resolve_driver_path()
+
+    elapsed, errors = run(urls, None, args.pool_size)
+    print(f"per-request drivers: {args.pages / elapsed:.2f} pages/s errors={errors}")
+
+    pool = BrowserPool(resolve_driver_path(), chrome_options, size=args.pool_size)
+    try:
+        elapsed, errors = run(urls, pool, args.pool_size)
+        print(f"pooled drivers (size={args.pool_size}): {args.pages / elapsed:.2f} pages/s errors={errors}")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
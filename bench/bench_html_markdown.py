@@ -0,0 +1,62 @@
+"""Throughput of the html_to_markdown backends on large HTML fixtures.
+
+The original BeautifulSoup walk ("bs4") is the reference output: every other
+backend's markdown is compared against it on each fixture. The checked-in
+golden files are asserted by tests/test_html_markdown.py.
+
+Usage: python bench/bench_html_markdown.py [--size-mb 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+from fixture_server import article_page
+from htmlMarkdown import html_to_markdown, lxml
+
+# Markup the streaming backend has to get right the same way html.parser does; shared with the golden tests
+TRICKY_FIXTURE = os.path.join(BENCH_DIR, "..", "tests", "golden", "html_markdown", "tricky.html")
+
+
+def build_fixture(size_mb):
+    # One well-formed document made of many article bodies
+    bodies = []
+    size = 0
+    index = 0
+    while size < size_mb * 1024 * 1024:
+        page = article_page(index, paragraphs=200, links=400, images=50).decode()
+        body = page[page.index("<body>") + len("<body>"):page.index("</body>")]
+        bodies.append(f"<div>{body}</div>")
+        size += len(body)
+        index += 1
+    return "<html><head><title>Large fixture</title></head><body>" + "".join(bodies) + "</body></html>"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = ["bs4", "stream"] + (["lxml"] if lxml is not None else [])
+    with open(TRICKY_FIXTURE, encoding="utf-8") as fixture:
+        tricky_html = fixture.read()
+    fixtures = {"tricky": tricky_html, f"large-{args.size_mb:g}MB": build_fixture(args.size_mb)}
+
+    for name, html in fixtures.items():
+        golden = html_to_markdown(html, "bs4")
+        for backend in backends:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                output = html_to_markdown(html, backend)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            throughput = len(html) / elapsed / (1024 * 1024)
+            print(f"{name:>12} {backend:>6}: {elapsed * 1000:8.1f}ms {throughput:6.2f} MB/s matches_bs4={output == golden}")
+
+
+if __name__ == "__main__":
+    main()
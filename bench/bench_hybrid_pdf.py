@@ -0,0 +1,71 @@
+"""Azure-only vs. hybrid extraction on a mostly born-digital PDF with a few scanned pages.
+
+Azure is the local fake from bench_azure_chunks.py (fitz analysis plus a
+per-call and per-page sleep). Scanned pages are full-page raster images
+without a text layer.
+
+Usage: python bench/bench_hybrid_pdf.py [--pages 100] [--scanned-every 10]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+os.environ.setdefault("AZURE_ENDPOINT_URL", "https://example.cognitiveservices.azure.com/")
+os.environ.setdefault("AZURE_KEY_API", "bench")
+
+import fitz  # PyMuPDF
+
+from azurePdfScraping import extract_pdf_data
+from bench_azure_chunks import FakeAnalysisClient
+from hybridPdf import extract_hybrid
+
+
+def build_mixed_pdf(pages, scanned_every):
+    doc = fitz.open()
+    scan = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 850, 1100), False)
+    scan.clear_with(235)
+    scan_png = scan.tobytes("png")
+    for page_num in range(pages):
+        page = doc.new_page()
+        if page_num % scanned_every == scanned_every - 1:
+            page.insert_image(page.rect, stream=scan_png)
+            continue
+        text = "\n".join(f"Page {page_num + 1} line {line}: lorem ipsum dolor sit amet" for line in range(40))
+        page.insert_text((72, 72), text, fontsize=9)
+    return doc.tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--scanned-every", type=int, default=10)
+    parser.add_argument("--base-latency", type=float, default=1.0)
+    parser.add_argument("--page-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    pdf_bytes = build_mixed_pdf(args.pages, args.scanned_every)
+
+    client = FakeAnalysisClient(args.base_latency, args.page_latency)
+    start = time.perf_counter()
+    extract_pdf_data(io.BytesIO(pdf_bytes), client=client)
+    azure_only = time.perf_counter() - start
+    print(f"azure only: {azure_only:.2f}s, {args.pages} pages analyzed in {client.calls} calls")
+
+    client = FakeAnalysisClient(args.base_latency, args.page_latency)
+    start = time.perf_counter()
+    extracted_data = extract_hybrid(io.BytesIO(pdf_bytes), client=client)
+    hybrid = time.perf_counter() - start
+    routes = Counter(decision["route"] for decision in extracted_data["routing"])
+    print(f"    hybrid: {hybrid:.2f}s ({azure_only / hybrid:.2f}x), routes={dict(routes)}")
+    print(f"    timing: {extracted_data['timing']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Image ingestion for /web/scrape: the old serial requests.get loop vs. ImageFetcher.fetch_all.
+
+A local image server answers with a fixed latency. The page references the
+same logo under several URLs, and one image is larger than the size cap.
+
+Usage: python bench/bench_image_fetch.py [--images 150] [--latency 0.05]
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+import requests
+
+from fixture_server import serve
+from imageFetcher import ImageFetcher
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=150)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    logo = os.urandom(8 * 1024)
+    files = {f"/img/{index}.jpg": (os.urandom(32 * 1024), "image/jpeg") for index in range(args.images)}
+    # Every tenth image is the shared logo served from its own URL
+    for index in range(0, args.images, 10):
+        files[f"/img/{index}.jpg"] = (logo, "image/png")
+    files["/img/huge.jpg"] = (os.urandom(20 * 1024 * 1024), "image/jpeg")
+    base_url, _ = serve(files, latency=args.latency)
+
+    # The page also repeats some URLs verbatim
+    urls = [f"{base_url}/img/{index}.jpg" for index in range(args.images)]
+    urls += urls[:20] + [f"{base_url}/img/huge.jpg"]
+
+    start = time.perf_counter()
+    serial_bytes = sum(len(requests.get(url).content) for url in urls)
+    elapsed = time.perf_counter() - start
+    print(f"serial loop: {elapsed:.2f}s, {len(urls)} downloads, {serial_bytes / 1024 / 1024:.1f} MB buffered")
+
+    fetcher = ImageFetcher(max_workers=args.workers, max_bytes=5 * 1024 * 1024)
+    start = time.perf_counter()
+    images, stats = fetcher.fetch_all(urls)
+    elapsed = time.perf_counter() - start
+    kept_bytes = sum(len(image["content"]) for image in images)
+    print(
+        f"fetch_all: {elapsed:.2f}s, {stats['unique_urls']} downloads, {stats['unique_images']} unique images, "
+        f"{len(stats['skipped'])} skipped, {kept_bytes / 1024 / 1024:.1f} MB kept"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Latency of small requests while large PDFs are being processed.
+
+Runs the API under uvicorn with an in-memory S3 stub and measures p50/p99 of
+GET /cache/stats while idle, while large PDFs run through POST /jobs, and
+while the same PDFs are processed inline on the event loop (the old
+behaviour of the endpoints).
+
+Usage: python bench/bench_job_latency.py [--pages 300] [--pdfs 4]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+# The Azure client is built at import time and needs some endpoint
+os.environ.setdefault("AZURE_ENDPOINT_URL", "https://localhost.invalid/")
+os.environ.setdefault("AZURE_KEY_API", "bench")
+os.environ.setdefault("S3_REGION", "us-east-1")
+os.environ.setdefault("SELENIUM_POOL_SIZE", "0")
+# Pages indexed during the run go to a throwaway search index, not the backend's
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-search-"), "search_index.db"))
+
+import requests
+import uvicorn
+
+import app as backend
+from bench_parallel_extract import build_pdf
+from s3stub import StubS3, install
+from uploadSpool import spool_bytes
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+@backend.app.post("/bench/inline-scrape")
+async def inline_scrape(pages: int):
+    # What the endpoints used to do: blocking work directly on the event loop
+    return backend.process_opensource_pdf(spool_bytes(build_pdf(pages), "inline.pdf"))
+
+
+def start_server():
+    install(backend, StubS3())
+    server = uvicorn.Server(uvicorn.Config(backend.app, host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def probe(duration):
+    latencies = []
+    session = requests.Session()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        session.get(f"{BASE_URL}/cache/stats").raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.01)
+    return latencies
+
+
+def summarize(label, latencies):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:>10}: n={len(latencies)} p50={statistics.median(latencies):.1f}ms p99={p99:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--pdfs", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    start_server()
+    summarize("idle", probe(args.duration))
+
+    # Distinct page counts so the extraction cache never short-circuits the work
+    for index in range(args.pdfs):
+        pdf_bytes = build_pdf(args.pages + index)
+        response = requests.post(f"{BASE_URL}/jobs", data={"kind": "pdf-opensource"}, files={"file": (f"big_{index}.pdf", pdf_bytes)})
+        print(f"submitted job {index}: HTTP {response.status_code}")
+    summarize("jobs", probe(args.duration))
+
+    for index in range(args.pdfs):
+        threading.Thread(
+            target=requests.post, args=(f"{BASE_URL}/bench/inline-scrape",), kwargs={"params": {"pages": args.pages + 100 + index}}, daemon=True
+        ).start()
+    summarize("inline", probe(args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Micro-benchmark of Azure markdown rendering on a 10k-cell table document.
+
+"legacy" is the previous save_markdown_data: one "Row: r, Column: c" line per
+cell built with +=, then written to extracted_data.md on every call. "grid"
+is the current save_markdown_data (list join, cells grouped into markdown
+grid rows, no file output); "grid+file" opts into the file write.
+
+Usage: python bench/bench_markdown_render.py [--rows 1000] [--columns 10] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+os.environ.setdefault("AZURE_ENDPOINT_URL", "https://example.cognitiveservices.azure.com/")
+os.environ.setdefault("AZURE_KEY_API", "bench")
+
+from azurePdfScraping import save_markdown_data
+from markdownRender import rows_from_cells
+
+
+def build_document(rows, columns, pages=20):
+    cells = [{"row": row, "column": column, "text": f"r{row} c{column} value"} for row in range(rows) for column in range(columns)]
+    text = "".join(f"Page {page + 1} line {line}: lorem ipsum dolor sit amet\n" for page in range(pages) for line in range(40))
+    return cells, text
+
+
+def legacy(cells, text, output_file_path):
+    markdown_content = f"# Extracted PDF Data\n\n"
+    markdown_content += f"## Text Data\n\n{text}\n\n"
+    markdown_content += f"## Tables\n\n"
+    markdown_content += f"### Table\n\n"
+    for cell in cells:
+        markdown_content += f"Row: {cell['row']}, Column: {cell['column']} - {cell['text']}\n"
+    markdown_content += "\n"
+    with open(output_file_path, "w") as md_file:
+        md_file.write(markdown_content)
+    return markdown_content
+
+
+def grid(cells, text, output_file_path=None):
+    # Includes grouping the cells, which extract_pdf_data does per table
+    extracted_data = {"text": text, "tables": [{"page": 1, "rows": rows_from_cells(cells)}], "pages": []}
+    return save_markdown_data(extracted_data, output_file_path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cells, text = build_document(args.rows, args.columns)
+    print(f"document: {len(cells)} cells, {len(text) / 1024:.0f}KB of text")
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_file_path = os.path.join(directory, "extracted_data.md")
+        modes = {
+            "legacy": lambda: legacy(cells, text, output_file_path),
+            "grid": lambda: grid(cells, text),
+            "grid+file": lambda: grid(cells, text, output_file_path)
+        }
+        for mode, run in modes.items():
+            run()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                markdown_content = run()
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f"{mode:>9}: {elapsed * 1000:.2f}ms per render, markdown={len(markdown_content) / 1024:.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark serial vs. process-pool page extraction in openSourcePdf.extract_data.
+
+The worker pool is spawned on first use and kept for the life of the process,
+so the first parallel call ("cold") includes process startup and later ones
+("warm") show the steady state of a running server.
+
+Usage: python bench/bench_parallel_extract.py [--pages 300] [--workers 1 2 4]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import fitz  # PyMuPDF
+
+from openSourcePdf import extract_data, save_to_md
+
+
+def build_pdf(pages):
+    # Synthetic filing: a few paragraphs and one small raster image per page
+    doc = fitz.open()
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    pixmap.clear_with(180)
+    for page_num in range(pages):
+        page = doc.new_page()
+        text = "\n".join(f"Page {page_num + 1} line {line}: lorem ipsum dolor sit amet" for line in range(40))
+        page.insert_text((72, 72), text, fontsize=9)
+        page.insert_image(fitz.Rect(400, 700, 464, 764), pixmap=pixmap)
+    return doc.tobytes()
+
+
+def run(pdf_bytes, workers):
+    start = time.perf_counter()
+    markdown_content = save_to_md(extract_data(io.BytesIO(pdf_bytes), workers=workers))
+    return time.perf_counter() - start, markdown_content
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    pdf_bytes = build_pdf(args.pages)
+    baseline_time, baseline_md = run(pdf_bytes, 1)
+    print(f"pages={args.pages} serial: {baseline_time:.2f}s")
+
+    for workers in args.workers:
+        if workers <= 1:
+            continue
+        cold, _ = run(pdf_bytes, workers)
+        elapsed, markdown_content = run(pdf_bytes, workers)
+        identical = markdown_content == baseline_md
+        print(f"workers={workers}: cold {cold:.2f}s, warm {elapsed:.2f}s speedup={baseline_time / elapsed:.2f}x identical={identical}")
+        if not identical:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""CPU time and peak RSS of PDF image handling: PIL/PNG/base64 round trip vs. native bytes.
+
+"legacy" reproduces the old pipeline (decode with PIL, re-encode as PNG,
+base64 into the markdown, base64-decode again for upload). "native" is
+extract_data with linked images; "native-inline" embeds base64 lazily in
+save_to_md. Each mode runs in a fresh process so peak RSS is its own.
+
+Usage: python bench/bench_pdf_images.py [--pages 60] [--images-per-page 4]
+"""
+import argparse
+import base64
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from openSourcePdf import extract_data, save_to_md
+
+
+def build_image_pdf(pages, images_per_page, size=400):
+    # Photo-like JPEGs: noisy pixels compress poorly as PNG, like real scans and photos
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        for index in range(images_per_page):
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, size, size), False)
+            pixmap.set_rect(pixmap.irect, (page_num * 7 % 255, index * 40 % 255, 128))
+            noise = Image.effect_noise((size, size), 40).convert("RGB")
+            buffered = io.BytesIO()
+            Image.blend(Image.frombytes("RGB", (size, size), pixmap.samples), noise, 0.5).save(buffered, format="JPEG", quality=85)
+            rect = fitz.Rect(36 + index * 130, 72, 156 + index * 130, 192)
+            page.insert_image(rect, stream=buffered.getvalue())
+    return doc.tobytes()
+
+
+def legacy(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    parts = []
+    uploaded = 0
+    for page_num in range(doc.page_count):
+        page = doc.load_page(page_num)
+        for img_index, img in enumerate(page.get_images(full=True)):
+            image = Image.open(io.BytesIO(doc.extract_image(img[0])["image"]))
+            buffered = io.BytesIO()
+            image.save(buffered, format="PNG")
+            img_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            parts.append(f"![image_{page_num + 1}_{img_index + 1}.png](data:image/png;base64,{img_base64})\n")
+            uploaded += len(base64.b64decode(img_base64))
+    return len("".join(parts)), uploaded
+
+
+def native(pdf_bytes, inline_images):
+    extracted_data = extract_data(io.BytesIO(pdf_bytes), workers=1)
+    markdown_content = save_to_md(extracted_data, inline_images=inline_images)
+    return len(markdown_content), sum(len(image["data"]) for image in extracted_data["images"])
+
+
+def measure(mode, pdf_bytes, results):
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    if mode == "legacy":
+        markdown_size, uploaded = legacy(pdf_bytes)
+    else:
+        markdown_size, uploaded = native(pdf_bytes, inline_images=(mode == "native-inline"))
+    results[mode] = {
+        "wall_s": time.perf_counter() - start,
+        "cpu_s": time.process_time() - start_cpu,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "markdown_mb": markdown_size / 1024 / 1024,
+        "uploaded_mb": uploaded / 1024 / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--images-per-page", type=int, default=4)
+    args = parser.parse_args()
+
+    pdf_bytes = build_image_pdf(args.pages, args.images_per_page)
+    print(f"fixture: {len(pdf_bytes) / 1024 / 1024:.1f} MB, {args.pages * args.images_per_page} images")
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    for mode in ("legacy", "native-inline", "native"):
+        process = context.Process(target=measure, args=(mode, pdf_bytes, results))
+        process.start()
+        process.join()
+        stats = results[mode]
+        print(
+            f"{mode:>13}: cpu={stats['cpu_s']:.2f}s wall={stats['wall_s']:.2f}s peak_rss={stats['peak_rss_mb']:.0f}MB "
+            f"markdown={stats['markdown_mb']:.1f}MB uploaded={stats['uploaded_mb']:.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Time and memory of PDF table handling: the old get_text("dict") dump vs. find_tables.
+
+"legacy" keeps every page's get_text("dict") and prints every line as
+pipe-joined spans (the previous "tables"). "all-pages" runs find_tables on
+every page. "ruled" is the table stage of extract_data, which only runs
+find_tables on pages with candidate ruling lines. Time is measured untraced; peak memory in a
+second pass under tracemalloc (which slows the pure-Python parts down).
+
+Usage: python bench/bench_pdf_tables.py [--documents 5] [--pages 40] [--table-every 3]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import fitz  # PyMuPDF
+
+from markdownRender import table_markdown
+from openSourcePdf import page_tables
+
+
+def build_table_pdf(pages, table_every, rows=12, columns=5):
+    # Prose pages with a page border; every ``table_every``-th page also carries a ruled grid
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.draw_rect(fitz.Rect(20, 20, 575, 822))
+        text = "\n".join(f"Page {page_num + 1} line {line}: lorem ipsum dolor sit amet" for line in range(30))
+        page.insert_text((72, 72), text, fontsize=9)
+        if page_num % table_every:
+            continue
+        left, top, cell_width, cell_height = 72, 400, 90, 24
+        for row in range(rows + 1):
+            y = top + row * cell_height
+            page.draw_line((left, y), (left + columns * cell_width, y))
+        for column in range(columns + 1):
+            x = left + column * cell_width
+            page.draw_line((x, top), (x, top + rows * cell_height))
+        for row in range(rows):
+            for column in range(columns):
+                label = f"Col {column + 1}" if row == 0 else f"r{row}c{column + 1}"
+                page.insert_text((left + column * cell_width + 4, top + row * cell_height + 16), label, fontsize=9)
+    return doc.tobytes()
+
+
+def legacy(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    tables = [doc.load_page(page_num).get_text("dict") for page_num in range(doc.page_count)]
+    lines = []
+    for table in tables:
+        lines.append("### Table\n")
+        for block in table["blocks"]:
+            if block["type"] == 0:
+                for line in block["lines"]:
+                    lines.append(" | ".join(span["text"] for span in line["spans"]) + "\n")
+        lines.append("\n")
+    return len(tables), len("".join(lines))
+
+
+def all_pages(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    found = 0
+    for page in doc:
+        found += len(page.find_tables().tables)
+    return found, 0
+
+
+def ruled(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    tables = []
+    for page_num in range(doc.page_count):
+        tables.extend(page_tables(doc.load_page(page_num), page_num))
+    return len(tables), len("".join(table_markdown(table) for table in tables))
+
+
+MODES = {"legacy": legacy, "all-pages": all_pages, "ruled": ruled}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--table-every", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = [build_table_pdf(args.pages, args.table_every) for _ in range(args.documents)]
+    print(f"corpus: {args.documents} documents x {args.pages} pages, a table every {args.table_every} pages")
+
+    for mode, run in MODES.items():
+        start = time.perf_counter()
+        found = output = 0
+        for pdf_bytes in corpus:
+            tables, size = run(pdf_bytes)
+            found += tables
+            output += size
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        for pdf_bytes in corpus:
+            run(pdf_bytes)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{mode:>9}: {elapsed:.2f}s peak_traced={peak / 1024 / 1024:.1f}MB tables={found} table_markdown={output / 1024:.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
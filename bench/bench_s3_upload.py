@@ -0,0 +1,60 @@
+"""Artifacts per second: the old serial put_object loop vs. S3Uploader.upload_batch.
+
+Uses the in-memory S3 stub with a per-request latency standing in for the
+network round trip.
+
+Usage: python bench/bench_s3_upload.py [--artifacts 200] [--latency 0.02]
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+from s3Uploader import S3Uploader
+from s3stub import StubS3
+
+
+def make_artifacts(count, size):
+    return [(os.urandom(size), "bench/images", f"image_{index + 1}.png", "image/png") for index in range(count)]
+
+
+def serial_loop(stub, artifacts):
+    for body, folder, filename, content_type in artifacts:
+        stub.put_object(Bucket="bench", Key=f"{folder}/{filename}", Body=body, ContentType=content_type)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--artifacts", type=int, default=200)
+    parser.add_argument("--size", type=int, default=32 * 1024)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 16, 32])
+    args = parser.parse_args()
+
+    artifacts = make_artifacts(args.artifacts, args.size)
+
+    start = time.perf_counter()
+    serial_loop(StubS3(latency=args.latency), artifacts)
+    elapsed = time.perf_counter() - start
+    print(f"serial loop: {args.artifacts / elapsed:.1f} artifacts/s")
+
+    for workers in args.workers:
+        uploader = S3Uploader(StubS3(latency=args.latency), "bench", max_workers=workers)
+        start = time.perf_counter()
+        uploader.upload_batch(artifacts)
+        elapsed = time.perf_counter() - start
+        print(f"upload_batch workers={workers}: {args.artifacts / elapsed:.1f} artifacts/s")
+
+    # A single large body goes through the multipart path
+    stub = StubS3(latency=args.latency)
+    uploader = S3Uploader(stub, "bench", multipart_threshold=5 * 1024 * 1024)
+    uploader.upload(os.urandom(40 * 1024 * 1024), "bench", "large.pdf", "application/pdf")
+    print(f"40 MB body: {stub.requests} multipart round trips")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Hit rate and time saved by the /web/scrape revalidation cache on a repeated crawl.
+
+A local fixture site is crawled through process_web_scrape with the
+ScrapingBee method, pointed at a local stand-in that adds a render delay
+before proxying the page. Half the pages carry ETags (304 path), the other
+half have no validators (content-fingerprint path). After a cold crawl,
+``--change-rate`` of the pages are edited and the site is crawled again,
+once with the cache and once without. S3 is an in-memory stub.
+
+Usage: python bench/bench_scrape_cache.py [--pages 100] [--change-rate 0.1] [--render-latency 0.5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+os.environ.setdefault("S3_REGION", "us-east-1")
+os.environ.setdefault("S3_BUCKET_NAME", "bench")
+os.environ.setdefault("SELENIUM_POOL_SIZE", "0")
+os.environ["SCRAPING_BEE_KEY"] = "bench"
+# Pages indexed during the run go to a throwaway search index, not the backend's
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-search-"), "search_index.db"))
+
+import requests
+
+from fixture_server import article_page, serve
+from s3stub import StubS3, install
+
+
+def scrapingbee_standin(render_latency):
+    # Fetches ?url= after a delay, like a rendering proxy billed per call
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(render_latency)
+            target = parse_qs(urlparse(self.path).query)["url"][0]
+            body = requests.get(target).content
+            with lock:
+                server.calls += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    lock = threading.Lock()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.calls = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/", server
+
+
+def site(pages, images, etags):
+    content = {}
+    base_url, server = serve(content, etags=etags)
+    for image in range(images):
+        content[f"/img/{image}.png"] = (os.urandom(20 * 1024), "image/png")
+    for index in range(pages):
+        content[f"/page/{index}"] = (page_html(base_url, index, images, revision=0), "text/html")
+    return base_url, server, content
+
+
+def page_html(base_url, index, images, revision):
+    html = article_page(index, paragraphs=100, links=50, images=images).decode()
+    html = html.replace('src="/img/', f'src="{base_url}/img/')
+    return html.replace("<h1>", f"<h1>Revision {revision} ", 1).encode()
+
+
+def crawl(backend, urls, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda url: backend.process_web_scrape(url, "ScrapingBee"), urls))
+    return time.perf_counter() - start, sum(1 for result in results if result.get("cached"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--images", type=int, default=5)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    parser.add_argument("--render-latency", type=float, default=0.5)
+    parser.add_argument("--s3-latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    endpoint, standin = scrapingbee_standin(args.render_latency)
+    os.environ["SCRAPING_BEE_EP"] = endpoint
+
+    import app as backend
+
+    stub = StubS3(latency=args.s3_latency)
+    install(backend, stub)
+
+    half = args.pages // 2
+    sites = [site(half, args.images, etags=True), site(args.pages - half, args.images, etags=False)]
+    urls = [f"{base_url}{path}" for base_url, _, content in sites for path in content if path.startswith("/page/")]
+
+    def run(label):
+        calls, s3_requests = standin.calls, stub.requests
+        seconds, hits = crawl(backend, urls, args.concurrency)
+        print(
+            f"{label:>22}: {seconds:.2f}s hits={hits}/{len(urls)} ({hits / len(urls):.0%}) "
+            f"scrapingbee_calls={standin.calls - calls} s3_requests={stub.requests - s3_requests}"
+        )
+        return seconds
+
+    run("cold crawl")
+
+    changed = 0
+    for base_url, _, content in sites:
+        paths = [path for path in content if path.startswith("/page/")]
+        for path in paths[:round(len(paths) * args.change_rate)]:
+            content[path] = (page_html(base_url, int(path.rsplit("/", 1)[1]), args.images, revision=1), "text/html")
+            changed += 1
+    print(f"changed {changed} of {len(urls)} pages")
+
+    cached_seconds = run("re-crawl, cache")
+    print(f"{'':>22}  {backend.get_scrape_cache().snapshot()}")
+
+    backend.WEB_SCRAPE_CACHE_TTL = 0
+    uncached_seconds = run("re-crawl, no cache")
+    print(f"time saved: {uncached_seconds - cached_seconds:.2f}s ({1 - cached_seconds / uncached_seconds:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Ingest and query latency of the search index at 100k+ pages.
+
+Documents are synthetic open-source-style markdown ("### Page N" sections of
+Zipf-distributed words from a fixed vocabulary), split with markdown_sections
+and indexed one document per transaction, as the endpoints do. Queries cover
+a common term, a rare term, an AND of two terms, a prefix, a deep page and a
+source filter; each is timed over repeated runs.
+
+Usage: python bench/bench_search_index.py [--documents 1000] [--pages 100] [--words 250]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+from searchIndex import SearchIndex, markdown_sections
+
+SOURCES = ("pdf_extraction/opensource", "pdf_extraction/enterprise", "pdf_extraction/auto", "web_scraping/scrapingbee")
+
+
+def vocabulary(size, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def document_markdown(pages, words_per_page, words, weights, rng):
+    parts = ["# Extracted Data from PDF\n\n", "## Extracted Text\n"]
+    for page_num in range(pages):
+        text = " ".join(rng.choices(words, weights, k=words_per_page))
+        parts.append(f"### Page {page_num + 1}\n\n{text}\n\n")
+    return "".join(parts)
+
+
+def timed_query(index, runs, **kwargs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = index.search(**kwargs)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))], len(result["results"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--words", type=int, default=250, help="words per page")
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = vocabulary(args.vocabulary, rng)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = SearchIndex(os.path.join(directory, "search.db"))
+
+        ingest_seconds = 0.0
+        for document in range(args.documents):
+            markdown_content = document_markdown(args.pages, args.words, words, weights, rng)
+            start = time.perf_counter()
+            index.index_document(f"bench/markdown/{document}.md", SOURCES[document % len(SOURCES)], markdown_sections(markdown_content), f"{document}.pdf")
+            ingest_seconds += time.perf_counter() - start
+        total_pages = args.documents * args.pages
+        size_mb = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)) / 1024 / 1024
+        print(
+            f"ingest: {total_pages} pages in {ingest_seconds:.1f}s ({total_pages / ingest_seconds:.0f} pages/s, "
+            f"{ingest_seconds / args.documents * 1000:.1f}ms per {args.pages}-page document), index {size_mb:.0f}MB"
+        )
+
+        # Re-indexing a document replaces its sections
+        start = time.perf_counter()
+        index.index_document("bench/markdown/0.md", SOURCES[0], markdown_sections(document_markdown(args.pages, args.words, words, weights, rng)), "0.pdf")
+        print(f"reindex one document: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        queries = {
+            "common term": {"query": words[0]},
+            "rare term": {"query": words[-1]},
+            "two terms": {"query": f"{words[5]} {words[500]}"},
+            "prefix": {"query": words[100][:3] + "*"},
+            "offset 1000": {"query": words[10], "offset": 1000},
+            "source filter": {"query": words[50], "source": "pdf_extraction"}
+        }
+        for label, query in queries.items():
+            p50, p95, count = timed_query(index, args.runs, limit=20, **query)
+            print(f"{label:>14}: p50={p50:.1f}ms p95={p95:.1f}ms results={count}")
+
+
+if __name__ == "__main__":
+    main()
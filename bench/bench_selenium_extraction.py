@@ -0,0 +1,57 @@
+"""WebDriver round trips and wall time: per-element extraction vs. one execute_script call.
+
+Needs a local Chrome. Large fixture pages are served locally; round trips are
+counted by wrapping the driver's command executor.
+
+Usage: python bench/bench_selenium_extraction.py [--links 2000] [--paragraphs 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from fixture_server import article_page, serve
+from seleniumScraping import _scrape_with_driver, chrome_options, resolve_driver_path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links", type=int, default=2000)
+    parser.add_argument("--paragraphs", type=int, default=500)
+    parser.add_argument("--images", type=int, default=200)
+    args = parser.parse_args()
+
+    page = article_page(0, paragraphs=args.paragraphs, links=args.links, images=args.images)
+    base_url, _ = serve({"/large": (page, "text/html")})
+
+    driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options())
+    commands = []
+    execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        commands.append(driver_command)
+        return execute(driver_command, params)
+
+    driver.execute = counting_execute
+    try:
+        outputs = {}
+        for mode in ("elements", "script"):
+            commands.clear()
+            start = time.perf_counter()
+            outputs[mode], _ = _scrape_with_driver(driver, f"{base_url}/large", mode)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:>8}: {len(commands)} round trips, {elapsed:.2f}s")
+        print(f"identical markdown: {outputs['elements'] == outputs['script']}")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Per-page load time and bytes transferred: default Selenium loads vs. fast-load mode.
+
+Needs a local Chrome. Fixture pages are served locally with real subresources
+(PNG images, a web font, a stylesheet, a video) plus a slow third-party
+"tracker" script from a second server. Fast-load mode blocks the tracker host
+through SELENIUM_BLOCKED_URLS. Bytes are counted by the fixture servers.
+
+Usage: python bench/bench_selenium_fast_load.py [--pages 10] [--images 30] [--tracker-latency 1.0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+import fitz  # PyMuPDF
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+import seleniumScraping
+from fixture_server import article_page, serve
+from seleniumScraping import _scrape_with_driver, chrome_options, resolve_driver_path
+
+
+def noise_png(seed, size=160):
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, size, size), False)
+    pixmap.set_rect(pixmap.irect, (seed * 7 % 255, 90, 160))
+    rng = random.Random(seed)
+    samples = bytearray(pixmap.samples)
+    for index in range(0, len(samples), 7):
+        samples[index] = rng.randrange(256)
+    return fitz.Pixmap(fitz.csRGB, size, size, bytes(samples), False).tobytes("png")
+
+
+def fixture_site(pages, images, tracker_url):
+    head = (
+        '<head><title>Fixture</title><link rel="stylesheet" href="/style.css">'
+        f'<script src="{tracker_url}/t.js"></script></head>'
+    )
+    site = {
+        "/style.css": (b"@font-face { font-family: Body; src: url(/body.woff2); } body { font-family: Body; }", "text/css"),
+        "/body.woff2": (os.urandom(120 * 1024), "font/woff2"),
+        "/clip.mp4": (os.urandom(1024 * 1024), "video/mp4")
+    }
+    for image in range(images):
+        site[f"/img/{image}.png"] = (noise_png(image), "image/png")
+    for index in range(pages):
+        html = article_page(index, paragraphs=40, links=60, images=images).decode()
+        html = html.replace("<head><title>Page {}</title></head>".format(index), head)
+        html = html.replace("</body>", '<video src="/clip.mp4" autoplay muted></video></body>')
+        site[f"/page/{index}"] = (html.encode(), "text/html")
+    return site
+
+
+def run(mode_name, fast_load, urls, servers):
+    driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options(fast_load=fast_load))
+    timings = []
+    transferred = []
+    outputs = []
+    try:
+        for url in urls:
+            # Fresh cache per page so every load pays for its resources
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            before = sum(server.bytes_sent for server in servers)
+            start = time.perf_counter()
+            markdown_content, _ = _scrape_with_driver(driver, url, "script", fast_load=fast_load)
+            timings.append(time.perf_counter() - start)
+            # Streams (video, late images) may still be downloading; give them a moment to be counted
+            time.sleep(0.2)
+            transferred.append(sum(server.bytes_sent for server in servers) - before)
+            outputs.append(markdown_content)
+    finally:
+        driver.quit()
+
+    average_ms = sum(timings) / len(timings) * 1000
+    average_kb = sum(transferred) / len(transferred) / 1024
+    print(f"{mode_name:>9}: {average_ms:.0f}ms per page (max {max(timings) * 1000:.0f}ms), {average_kb:.0f}KB per page")
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--tracker-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    tracker_url, tracker = serve({"/t.js": (b"window.tracked = true;", "application/javascript")}, latency=args.tracker_latency)
+    base_url, site = serve(fixture_site(args.pages, args.images, tracker_url))
+    urls = [f"{base_url}/page/{index}" for index in range(args.pages)]
+
+    seleniumScraping.SELENIUM_BLOCKED_URLS = [f"{tracker_url}/*"]
+    default_outputs = run("default", False, urls, (site, tracker))
+    fast_outputs = run("fast-load", True, urls, (site, tracker))
+    print(f"identical markdown: {default_outputs == fast_outputs}")
+
+
+if __name__ == "__main__":
+    main()
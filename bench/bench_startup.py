@@ -0,0 +1,74 @@
+"""Cold-start cost of the API: time to import app.py and RSS afterwards.
+
+Each sample is a fresh interpreter importing the backend's ``app`` module.
+``--baseline REV`` also measures the backend as of an earlier git revision
+(exported to a temp directory), so before/after can be read side by side.
+Also lists which heavy libraries the import pulled in.
+
+Usage: python bench/bench_startup.py [--runs 5] [--baseline HEAD~1]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY_MODULES = ("fitz", "azure.ai.formrecognizer", "selenium", "webdriver_manager", "boto3", "httpx", "bs4", "PIL", "uvicorn")
+
+PROBE = f"""
+import json, resource, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_s": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+}}))
+"""
+
+
+def measure(backend_dir, runs):
+    env = dict(os.environ)
+    # The old app built the Azure client at import time and needs these set
+    env.setdefault("AZURE_ENDPOINT_URL", "https://example.cognitiveservices.azure.com/")
+    env.setdefault("AZURE_KEY_API", "bench")
+    env.setdefault("S3_REGION", "us-east-1")
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE], cwd=backend_dir, env=env, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_s": statistics.median(sample["import_s"] for sample in samples),
+        "rss_mb": statistics.median(sample["rss_mb"] for sample in samples),
+        "modules": samples[-1]["modules"],
+        "heavy": samples[-1]["heavy"]
+    }
+
+
+def report(label, stats):
+    print(f"{label:>10}: import={stats['import_s'] * 1000:.0f}ms rss={stats['rss_mb']:.0f}MB modules={stats['modules']} heavy={','.join(stats['heavy']) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    args = parser.parse_args()
+
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            archive = subprocess.run(["git", "archive", args.baseline, "backend"], cwd=REPO_DIR, capture_output=True, check=True).stdout
+            subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+            report(args.baseline, measure(os.path.join(directory, "backend"), args.runs))
+
+    report("current", measure(os.path.join(REPO_DIR, "backend"), args.runs))
+
+
+if __name__ == "__main__":
+    main()
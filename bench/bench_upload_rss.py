@@ -0,0 +1,131 @@
+"""Peak RSS of the API while it ingests several large PDF uploads at once.
+
+The fixture is a short text PDF carrying a large incompressible attachment,
+so the upload is big but extraction is cheap and memory is dominated by how
+the body is ingested (read into memory vs. spooled to disk) and uploaded to
+S3. The API runs in its own process under uvicorn with an S3 stub that drops
+large bodies; its peak RSS (VmHWM) is read from /proc. ``--baseline REV``
+also measures the backend as of an earlier git revision.
+
+Usage: python bench/bench_upload_rss.py [--size-mb 100] [--uploads 4] [--baseline HEAD~1]
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, BENCH_DIR)
+
+SERVER = """
+import sys, uvicorn
+sys.path.insert(0, {bench_dir!r})
+import app as backend
+from s3stub import StubS3, install
+install(backend, StubS3(discard_over=1024 * 1024))
+uvicorn.run(backend.app, host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def large_pdf(size_mb):
+    import fitz  # PyMuPDF
+    from fixtures import FIXTURE_DIR, text_pdf
+
+    path = os.path.join(FIXTURE_DIR, f"attachment-{size_mb}mb.pdf")
+    if not os.path.exists(path):
+        doc = fitz.open(stream=text_pdf(10), filetype="pdf")
+        doc.embfile_add("payload.bin", random.Random(size_mb).randbytes(size_mb * 1024 * 1024))
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        doc.save(path)
+    return path
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _memory_mb(pid, field):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+
+
+def measure(backend_dir, pdf_path, uploads):
+    port = _free_port()
+    env = dict(os.environ, SELENIUM_POOL_SIZE="0", S3_BUCKET_NAME="bench", S3_REGION="us-east-1")
+    # The old app built the Azure client at import time and needs these set
+    env.setdefault("AZURE_ENDPOINT_URL", "https://example.cognitiveservices.azure.com/")
+    env.setdefault("AZURE_KEY_API", "bench")
+    env.setdefault("SEARCH_INDEX_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-search-"), "search_index.db"))
+    server = subprocess.Popen([sys.executable, "-c", SERVER.format(bench_dir=BENCH_DIR, port=port)], cwd=backend_dir, env=env)
+    try:
+        url = f"http://127.0.0.1:{port}"
+        while True:
+            try:
+                requests.get(f"{url}/cache/stats", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        idle_mb = _memory_mb(server.pid, "VmRSS")
+
+        def send(index):
+            # Streamed from disk with a unique name and trailing comment, so no upload is a cache hit
+            with open(pdf_path, "rb") as pdf:
+                body = pdf.read() + f"\n%bench-{index}\n".encode()
+            response = requests.post(
+                f"{url}/pdf/opensource-scrape",
+                params={"inline_images": "false"},
+                files={"file": (f"large-{index}.pdf", body, "application/pdf")}
+            )
+            return response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=uploads) as executor:
+            statuses = list(executor.map(send, range(uploads)))
+        elapsed = time.perf_counter() - start
+        return {"idle_mb": idle_mb, "peak_mb": _memory_mb(server.pid, "VmHWM"), "seconds": elapsed, "statuses": statuses}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(label, stats, upload_mb):
+    errors = sum(status != 200 for status in stats["statuses"])
+    print(
+        f"{label:>10}: idle={stats['idle_mb']:.0f}MB peak={stats['peak_mb']:.0f}MB "
+        f"(+{stats['peak_mb'] - stats['idle_mb']:.0f}MB for {upload_mb:.0f}MB uploaded) in {stats['seconds']:.1f}s errors={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--uploads", type=int, default=4)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    args = parser.parse_args()
+
+    pdf_path = large_pdf(args.size_mb)
+    upload_mb = os.path.getsize(pdf_path) * args.uploads / 1024 / 1024
+
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            archive = subprocess.run(["git", "archive", args.baseline, "backend"], cwd=REPO_DIR, capture_output=True, check=True).stdout
+            subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+            report(args.baseline, measure(os.path.join(directory, "backend"), pdf_path, args.uploads), upload_mb)
+
+    report("current", measure(os.path.join(REPO_DIR, "backend"), pdf_path, args.uploads), upload_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Local HTTP server for the scraping benchmarks.
+
+``serve(pages)`` serves a dict of path -> (body bytes, content type) on an
+ephemeral port from a background thread and returns the base URL. ``latency``
+delays every response to stand in for a remote server. With ``etags`` every
+page carries an ETag (a hash of its body) and matching If-None-Match requests
+get a 304. HEAD requests get the same status and headers without the body. The returned server counts ``requests`` and ``bytes_sent`` (bodies
+written). ``pages`` is read on every request, so it can be changed live.
+"""
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def serve(pages, latency=0.0, etags=False):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._respond(send_body=True)
+
+        def do_HEAD(self):
+            self._respond(send_body=False)
+
+        def _respond(self, send_body):
+            if latency:
+                time.sleep(latency)
+            body, content_type = pages.get(self.path.split("?")[0], (b"not found", "text/plain"))
+            etag = f'"{hashlib.sha1(body).hexdigest()}"' if etags and self.path.split("?")[0] in pages else None
+            if etag is not None and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                with lock:
+                    server.requests += 1
+                return
+            self.send_response(200 if self.path.split("?")[0] in pages else 404)
+            if etag is not None:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not send_body:
+                with lock:
+                    server.requests += 1
+                return
+            try:
+                self.wfile.write(body)
+                with lock:
+                    server.requests += 1
+                    server.bytes_sent += len(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # Clients may hang up early (size cutoffs)
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    lock = threading.Lock()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.requests = 0
+    server.bytes_sent = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server
+
+
+def article_page(index, paragraphs=50, links=100, images=20):
+    parts = [f"<html><head><title>Page {index}</title></head><body><h1>Article {index}</h1>"]
+    for para in range(paragraphs):
+        parts.append(f"<h2>Section {para}</h2><p>Paragraph {para} of page {index}. Lorem ipsum dolor sit amet.</p>")
+    parts.append("<table>" + "".join(f"<tr><td>r{row}</td><td>{row * index}</td></tr>" for row in range(20)) + "</table>")
+    parts.extend(f'<a href="/page/{link}">Link {link}</a>' for link in range(links))
+    parts.extend(f'<img src="/img/{img}.png">' for img in range(images))
+    parts.append("</body></html>")
+    return "".join(parts).encode()
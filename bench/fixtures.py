@@ -0,0 +1,78 @@
+"""Deterministic synthetic fixtures for the benchmark suite.
+
+``pdf_fixture(kind, pages)`` builds a text-, image- or table-heavy PDF and
+``html_fixture(paragraphs)`` a large article page. Generated PDFs are cached
+under the system temp directory, keyed by kind, page count and FIXTURE_VERSION,
+so repeated runs (and runs on other commits) measure the same bytes.
+"""
+import io
+import os
+import random
+import tempfile
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from bench_pdf_tables import build_table_pdf
+from fixture_server import article_page
+
+# Bump when a generator changes so cached fixtures are rebuilt
+FIXTURE_VERSION = "1"
+
+FIXTURE_DIR = os.path.join(tempfile.gettempdir(), "scraper-bench-fixtures")
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et dolore magna aliqua".split()
+
+
+def text_pdf(pages):
+    # Dense prose: a heading and ~60 lines per page
+    rng = random.Random(pages)
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Section {page_num + 1}", fontsize=14)
+        lines = [" ".join(rng.choice(WORDS) for _ in range(14)) for _ in range(60)]
+        page.insert_text((72, 84), "\n".join(lines), fontsize=8)
+    return doc.tobytes()
+
+
+def image_pdf(pages, images_per_page=4, size=300):
+    # Photo-like JPEGs from seeded noise, a distinct image per slot
+    rng = random.Random(pages)
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Figure page {page_num + 1}", fontsize=12)
+        for index in range(images_per_page):
+            noise = Image.frombytes("RGB", (size, size), rng.randbytes(size * size * 3))
+            tint = Image.new("RGB", (size, size), (page_num * 7 % 255, index * 60 % 255, 128))
+            buffered = io.BytesIO()
+            Image.blend(tint, noise, 0.4).save(buffered, format="JPEG", quality=80)
+            column, row = index % 2, index // 2
+            rect = fitz.Rect(72 + column * 230, 90 + row * 330, 292 + column * 230, 400 + row * 330)
+            page.insert_image(rect, stream=buffered.getvalue())
+    return doc.tobytes()
+
+
+def table_pdf(pages):
+    return build_table_pdf(pages, table_every=1)
+
+
+PDF_GENERATORS = {"text": text_pdf, "image": image_pdf, "table": table_pdf}
+
+
+def pdf_fixture(kind, pages):
+    path = os.path.join(FIXTURE_DIR, f"{kind}-{pages}-v{FIXTURE_VERSION}.pdf")
+    if os.path.exists(path):
+        with open(path, "rb") as fixture:
+            return fixture.read()
+    pdf_bytes = PDF_GENERATORS[kind](pages)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(path, "wb") as fixture:
+        fixture.write(pdf_bytes)
+    return pdf_bytes
+
+
+def html_fixture(paragraphs):
+    # About 130 bytes per paragraph plus links, images and a table
+    return article_page(0, paragraphs=paragraphs, links=paragraphs // 2, images=paragraphs // 20)
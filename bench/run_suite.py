@@ -0,0 +1,297 @@
+"""Benchmark suite for the extraction and scraping pipelines, with JSON output.
+
+Every case runs in a fresh process so its peak RSS is its own. Cases:
+
+- ``pdf-<kind>-<pages>``: extract_data + save_to_md on a synthetic text-,
+  image- or table-heavy PDF (see fixtures.py)
+- ``azure-render-<pages>``: save_markdown_data on a fake Azure result
+- ``scrape-page-<paragraphs>``: scrape_page against a local fixture server
+  standing in for ScrapingBee (fetch + parse)
+- ``endpoint-<name>``: concurrent requests to the FastAPI app under uvicorn
+  with an in-memory S3 stub and a fake Azure client
+
+Each result has wall/CPU seconds, peak RSS (and RSS before the measured
+call, i.e. after imports and fixture setup) and output bytes. Save a run
+per commit and compare two with ``--compare``.
+
+Usage:
+    python bench/run_suite.py [--pages 1 10 100] [--kinds text image table] [--output results.json]
+    python bench/run_suite.py --only endpoint --requests 64 --concurrency 8
+    python bench/run_suite.py --compare old.json --output new.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "backend"))
+
+os.environ.setdefault("AZURE_ENDPOINT_URL", "https://example.cognitiveservices.azure.com/")
+os.environ.setdefault("AZURE_KEY_API", "bench")
+os.environ.setdefault("S3_REGION", "us-east-1")
+os.environ.setdefault("S3_BUCKET_NAME", "bench")
+os.environ.setdefault("SELENIUM_POOL_SIZE", "0")
+os.environ.setdefault("SCRAPING_BEE_KEY", "bench")
+# Pages indexed during the run go to a throwaway search index, not the backend's
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-search-"), "search_index.db"))
+
+ENDPOINTS = ("opensource", "enterprise", "auto", "web")
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(run):
+    rss_before = _rss_mb()
+    start_cpu = _cpu_seconds()
+    start = time.perf_counter()
+    output_bytes = run()
+    return {
+        "wall_s": round(time.perf_counter() - start, 4),
+        "cpu_s": round(_cpu_seconds() - start_cpu, 4),
+        "rss_before_mb": round(rss_before, 1),
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "output_bytes": output_bytes
+    }
+
+
+def _pdf_case(kind, pages):
+    import io
+    from fixtures import pdf_fixture
+    from openSourcePdf import extract_data, save_to_md
+
+    pdf_bytes = pdf_fixture(kind, pages)
+
+    def run():
+        return len(save_to_md(extract_data(io.BytesIO(pdf_bytes))).encode())
+
+    result = _measure(run)
+    result["input_bytes"] = len(pdf_bytes)
+    return result
+
+
+def _azure_render_case(pages):
+    import io
+    from azurePdfScraping import extract_pdf_data, save_markdown_data
+    from bench_azure_chunks import FakeAnalysisClient
+    from fixtures import pdf_fixture
+
+    # The fake puts one table on every page; add a larger grid so rendering has cells to group
+    extracted_data = extract_pdf_data(io.BytesIO(pdf_fixture("text", pages)), client=FakeAnalysisClient(0, 0))
+    grid = [[f"r{row} c{column}" for column in range(8)] for row in range(50)]
+    extracted_data["tables"].extend({"page": page + 1, "rows": grid} for page in range(pages))
+    return _measure(lambda: len(save_markdown_data(extracted_data).encode()))
+
+
+def _scrape_page_case(paragraphs):
+    from fixture_server import serve
+    from fixtures import html_fixture
+
+    html = html_fixture(paragraphs)
+    base_url, server = serve({"/": (html, "text/html")})
+    os.environ["SCRAPING_BEE_EP"] = base_url + "/"
+    from scrapingBee import scrape_page
+
+    try:
+        result = _measure(lambda: len(scrape_page("https://example.com/article", "bench")[0].encode()))
+    finally:
+        server.shutdown()
+    result["input_bytes"] = len(html)
+    return result
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _endpoint_case(name, requests_count, concurrency, pages):
+    import requests
+    import uvicorn
+    from fixture_server import serve
+    from fixtures import html_fixture, pdf_fixture
+
+    base_url, fixture_server = serve({"/": (html_fixture(500), "text/html")})
+    os.environ["SCRAPING_BEE_EP"] = base_url + "/"
+
+    import app as backend
+    import azurePdfScraping
+    from bench_azure_chunks import FakeAnalysisClient
+    from s3stub import StubS3, install
+
+    install(backend, StubS3())
+    fake_client = FakeAnalysisClient(0.05, 0.005)
+    azurePdfScraping.get_client = lambda: fake_client
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(backend.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    api_url = f"http://127.0.0.1:{port}"
+
+    pdf_bytes = pdf_fixture("text", pages)
+    paths = {"opensource": "/pdf/opensource-scrape", "enterprise": "/pdf/enterprise-scrape", "auto": "/pdf/auto-scrape"}
+
+    def send(index):
+        start = time.perf_counter()
+        if name == "web":
+            response = requests.post(f"{api_url}/web/scrape", json={"url": f"https://example.com/{index}", "method": "ScrapingBee"})
+        else:
+            # Trailing bytes after %%EOF make every upload unique, so none is a cache hit
+            unique_pdf = pdf_bytes + f"\n%bench-{index}\n".encode()
+            response = requests.post(f"{api_url}{paths[name]}", files={"file": (f"bench-{index}.pdf", unique_pdf, "application/pdf")})
+        return time.perf_counter() - start, response.status_code, len(response.content)
+
+    latencies = []
+    errors = 0
+
+    def run():
+        nonlocal errors
+        output_bytes = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for latency, status, size in executor.map(send, range(requests_count)):
+                latencies.append(latency)
+                errors += status != 200
+                output_bytes += size
+        return output_bytes
+
+    try:
+        result = _measure(run)
+    finally:
+        server.should_exit = True
+        fixture_server.shutdown()
+
+    latencies.sort()
+    result.update({
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests_count / result["wall_s"], 2),
+        "p50_s": round(statistics.median(latencies), 4),
+        "p95_s": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4)
+    })
+    return result
+
+
+def _run_case(case, results):
+    kind = case["case"]
+    try:
+        if kind == "pdf":
+            result = _pdf_case(case["kind"], case["pages"])
+        elif kind == "azure-render":
+            result = _azure_render_case(case["pages"])
+        elif kind == "scrape-page":
+            result = _scrape_page_case(case["paragraphs"])
+        else:
+            result = _endpoint_case(case["endpoint"], case["requests"], case["concurrency"], case["pages"])
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    results[case["name"]] = result
+
+
+def build_cases(args):
+    cases = []
+    for pages in args.pages:
+        for kind in args.kinds:
+            cases.append({"name": f"pdf-{kind}-{pages}", "case": "pdf", "kind": kind, "pages": pages})
+        cases.append({"name": f"azure-render-{pages}", "case": "azure-render", "pages": pages})
+    for paragraphs in args.paragraphs:
+        cases.append({"name": f"scrape-page-{paragraphs}", "case": "scrape-page", "paragraphs": paragraphs})
+    for endpoint in args.endpoints:
+        cases.append({
+            "name": f"endpoint-{endpoint}", "case": "endpoint", "endpoint": endpoint,
+            "requests": args.requests, "concurrency": args.concurrency, "pages": args.endpoint_pages
+        })
+    if args.only:
+        cases = [case for case in cases if any(pattern in case["name"] for pattern in args.only)]
+    return cases
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(baseline, current):
+    print(f"\ncompared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or "error" in old or "error" in result:
+            continue
+        ratios = "  ".join(
+            f"{metric}={result[metric] / old[metric]:.2f}x" for metric in ("wall_s", "cpu_s", "peak_rss_mb", "output_bytes") if old.get(metric)
+        )
+        print(f"{name:>24}: {ratios}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100], help="PDF sizes, up to 1000")
+    parser.add_argument("--kinds", nargs="+", default=["text", "image", "table"])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[1000, 20000], help="HTML fixture sizes")
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS))
+    parser.add_argument("--endpoint-pages", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", nargs="+", help="Run only cases whose name contains one of these")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    for case in build_cases(args):
+        process = context.Process(target=_run_case, args=(case, results))
+        process.start()
+        process.join()
+        result = results.get(case["name"], {"error": f"exit code {process.exitcode}"})
+        if "error" in result:
+            print(f"{case['name']:>24}: {result['error']}")
+        else:
+            print(
+                f"{case['name']:>24}: wall={result['wall_s']:.3f}s cpu={result['cpu_s']:.3f}s "
+                f"peak_rss={result['peak_rss_mb']:.0f}MB output={result['output_bytes'] / 1024:.0f}KB"
+                + (f" p50={result['p50_s']:.3f}s p95={result['p95_s']:.3f}s rps={result['throughput_rps']}" if "p50_s" in result else "")
+            )
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": dict(results)
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+    print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(json.load(baseline), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""In-memory stand-in for the boto3 S3 client used by the benchmarks.
+
+Only the calls the backend makes are implemented. ``latency`` adds a fixed
+delay per request to mimic a network round trip. Bodies larger than
+``discard_over`` bytes are read and dropped instead of kept, so a stub behind
+large uploads does not dominate the process's memory.
+"""
+import io
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+
+class StubS3:
+    def __init__(self, latency: float = 0.0, discard_over: int = None):
+        self.latency = latency
+        self.discard_over = discard_over
+        self.objects = {}
+        self.metadata = {}
+        self.requests = 0
+        self._multipart = {}
+        self._lock = threading.Lock()
+
+    def _round_trip(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _store(self, key, body):
+        if self.discard_over is not None and len(body) > self.discard_over:
+            body = b""
+        self.objects[key] = body
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, Metadata=None, **kwargs):
+        self._round_trip()
+        self._store(Key, Body if isinstance(Body, bytes) else Body.read())
+        self.metadata[Key] = Metadata or {}
+        return {"ETag": "stub"}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self._round_trip()
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "Not Found"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key]), "Metadata": self.metadata.get(Key, {})}
+
+    def copy_object(self, Bucket, Key, CopySource, **kwargs):
+        self._round_trip()
+        self.objects[Key] = self.objects[CopySource["Key"]]
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self._round_trip()
+        self._multipart[Key] = []
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        self._round_trip()
+        self._multipart[Key].append(Body if isinstance(Body, bytes) else Body.read())
+        return {"ETag": str(PartNumber)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        self._round_trip()
+        self._store(Key, b"".join(self._multipart.pop(Key)))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._multipart.pop(Key, None)
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Config=None, **kwargs):
+        # One round trip per part, like the managed transfer
+        chunk_size = Config.multipart_chunksize if Config else 8 * 1024 * 1024
+        parts = []
+        size = 0
+        for chunk in iter(lambda: Fileobj.read(chunk_size), b""):
+            self._round_trip()
+            size += len(chunk)
+            parts.append(chunk)
+            if self.discard_over is not None and size > self.discard_over:
+                parts.clear()
+        self.objects[Key] = b"".join(parts) if self.discard_over is None or size <= self.discard_over else b""
+
+
+def install(backend, stub):
+    """Point every S3 consumer in the backend ``app`` module at ``stub``."""
+    backend.s3_client = stub
+    backend.uploader.s3_client = stub
+    backend.extraction_cache.s3_client = stub
@@ -1,109 +1,241 @@
 import streamlit as st
 import requests
-import io
- 
+import hashlib
+import os
+import posixpath
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+API_URL = os.getenv("API_URL", "https://bigdataspring2025assignment1.onrender.com")
+##API_URL = "http://localhost:8000"
+
+# How often running jobs are polled for progress, and how many are submitted at once
+POLL_SECONDS = 0.5
+SUBMIT_WORKERS = 4
+
+# Scraped pages change, so their results are only reused for a while; PDF results are keyed by content
+WEB_RESULT_TTL = 600
+
+PDF_JOB_KINDS = {"OpenSource": "pdf-opensource", "Enterprise": "pdf-enterprise", "Auto": "pdf-auto"}
+
+# Linked markdown points at ../images/<name>, relative to the markdown folder in S3
+PDF_MARKDOWN_FOLDERS = {"pdf-opensource": "pdf_extraction/opensource/markdown", "pdf-auto": "pdf_extraction/auto/markdown"}
+
+SECTION_HEADING = re.compile(r"^(?=#{1,3} )", re.MULTILINE)
+RELATIVE_IMAGE = re.compile(r"!\[([^\]]*)\]\((\.\./[^)\s]+)\)")
+
+
+def _error_detail(response):
+    # FastAPI errors carry a "detail"; a proxy in front of the backend may answer with plain text
+    try:
+        return response.json().get("detail", response.text)
+    except ValueError:
+        return f"{response.status_code}: {response.text}"
+
+
+def _run_job(fields, files, progress):
+    # Submit to /jobs, then poll it; progress is a dict the page reads while the job runs
+    while True:
+        response = requests.post(f"{API_URL}/jobs", data=fields, files=files)
+        if response.status_code != 429:
+            break
+        progress["message"] = "Backend busy, waiting for a slot"
+        time.sleep(float(response.headers.get("Retry-After", "5")))
+    if response.status_code != 202:
+        raise RuntimeError(_error_detail(response))
+    job_id = response.json()["job_id"]
+
+    while True:
+        response = requests.get(f"{API_URL}/jobs/{job_id}")
+        if response.status_code != 200:
+            raise RuntimeError(_error_detail(response))
+        job = response.json()
+        progress["fraction"] = job["progress"]
+        progress["message"] = job["message"]
+        if job["status"] in ("succeeded", "failed"):
+            break
+        time.sleep(POLL_SECONDS)
+
+    response = requests.get(f"{API_URL}/jobs/{job_id}/result")
+    if response.status_code != 200:
+        raise RuntimeError(_error_detail(response))
+    return response.json()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def run_pdf_job(file_hash, kind, filename, _contents, _progress):
+    # Cached by file hash, so reruns and re-uploads of the same PDF never hit the backend again
+    fields = {"kind": kind, "inline_images": "false"}
+    return _run_job(fields, {"file": (filename, _contents, "application/pdf")}, _progress)
+
+
+@st.cache_data(show_spinner=False, max_entries=256, ttl=WEB_RESULT_TTL)
+def run_web_job(url, method, _progress):
+    return _run_job({"kind": "web-scrape", "url": url, "method": method}, None, _progress)
+
+
+@st.cache_data(show_spinner=False, ttl=1800)
+def presigned_urls(keys):
+    # The backend signs links for an hour; they are reused for half of that
+    response = requests.post(f"{API_URL}/s3/presign", json={"keys": list(keys)})
+    response.raise_for_status()
+    return response.json()["urls"]
+
+
+def split_sections(markdown_content):
+    # One entry per page ("### Page N"), table or top-level section
+    return [section for section in SECTION_HEADING.split(markdown_content) if section.strip()]
+
+
+def section_title(section):
+    return section.splitlines()[0].lstrip("#").strip()[:80]
+
+
+def with_presigned_images(section, markdown_folder):
+    # Only the images of the section on screen are signed, and the browser fetches them from S3
+    links = {link: posixpath.normpath(posixpath.join(markdown_folder, link)) for _, link in RELATIVE_IMAGE.findall(section)}
+    if not links:
+        return section
+    try:
+        urls = presigned_urls(tuple(sorted(set(links.values()))))
+    except requests.exceptions.RequestException:
+        return section
+    return RELATIVE_IMAGE.sub(lambda match: f"![{match.group(1)}]({urls.get(links[match.group(2)], match.group(2))})", section)
+
+
+def run_concurrently(tasks):
+    """Run (label, fn, args, display) tasks on a thread pool, showing live progress for each.
+
+    Finished results, merged with their display settings, or error messages are
+    stored in st.session_state["results"].
+    """
+    ctx = get_script_run_ctx()
+    progress = {label: {"fraction": 0.0, "message": "Queued"} for label, _, _, _ in tasks}
+    bars = {label: st.progress(0.0, text=f"{label}: Queued") for label, _, _, _ in tasks}
+    display = {label: task_display for label, _, _, task_display in tasks}
+    with ThreadPoolExecutor(max_workers=SUBMIT_WORKERS, initializer=lambda: add_script_run_ctx(None, ctx)) as executor:
+        futures = {label: executor.submit(fn, *args, progress[label]) for label, fn, args, _ in tasks}
+        while True:
+            for label, bar in bars.items():
+                state = progress[label]
+                bar.progress(min(max(state["fraction"], 0.0), 1.0), text=f"{label}: {state['message']}")
+            if all(future.done() for future in futures.values()):
+                break
+            time.sleep(POLL_SECONDS)
+
+    for label, future in futures.items():
+        try:
+            st.session_state["results"][label] = dict(future.result(), **display[label])
+        except Exception as e:
+            st.session_state["results"][label] = {"error": str(e)}
+        bars[label].empty()
+
+
+def show_results():
+    results = st.session_state["results"]
+    if not results:
+        return
+    st.markdown("<h3>Results</h3>", unsafe_allow_html=True)
+    label = st.selectbox("Result", list(results), key="result_label")
+    data = results[label]
+    if "error" in data:
+        st.error(f"Error: {data['error']}")
+        return
+
+    st.success(data["message"])
+    sections = split_sections(data["markdown_content"])
+    if sections:
+        # Render one page or section at a time instead of the whole document
+        index = st.selectbox(
+            f"Section ({len(sections)} total)", range(len(sections)), format_func=lambda i: f"{i + 1}. {section_title(sections[i])}", key=f"section_{label}"
+        )
+        section = sections[index]
+        if data.get("markdown_folder"):
+            section = with_presigned_images(section, data["markdown_folder"])
+        st.markdown(section)
+
+    st.download_button(
+        label="Download Markdown File",
+        data=data["markdown_content"],
+        file_name=data.get("file_name", "extracted_data.md"),
+        mime="text/markdown",
+        key=f"download_{label}"
+    )
+
+
 def dashboard_page():
     # Set page config for the dashboard
     st.set_page_config(page_title="Dashboard", layout="wide", initial_sidebar_state="collapsed")
- 
+    st.session_state.setdefault("results", {})
+
     col1, col2 = st.columns([4, 1])
     with col1:
         st.markdown("<h1>Dashboard</h1>", unsafe_allow_html=True)
-    
-    
+
+
     # Create main content area
     col1, col2, col3 = st.columns([1, 3, 1])
     with col2:
         st.markdown("<h2>Select Scraping Method</h2>", unsafe_allow_html=True)
-        
+
         scraping_option = st.selectbox(
             'Select Scraping Type',
             ('Select Option', 'PDF Scraping', 'Web Scraping'),
             index=0
         )
- 
+
         if scraping_option == 'PDF Scraping':
             st.markdown("<h3>Select PDF Scraping Method</h3>", unsafe_allow_html=True)
-            
+
             pdf_scraping_option = st.selectbox(
                 'Select PDF Scraping Option',
-                ('Select Option', 'OpenSource', 'Enterprise'),
+                ('Select Option', 'OpenSource', 'Enterprise', 'Auto'),
                 index=0
             )
- 
+
             if pdf_scraping_option != 'Select Option':
-                st.write(f"Upload your PDF for {pdf_scraping_option}.")
-                pdf_file = st.file_uploader("Choose a PDF", type="pdf", key=f"{pdf_scraping_option.lower()}_pdf")
-                
-                if pdf_file:
-                    with st.spinner(f"Scraping '{pdf_file.name}' in progress..."):
-                        files = {"file": pdf_file.getvalue()}
-                        endpoint = f"https://bigdataspring2025assignment1.onrender.com/pdf/{pdf_scraping_option.lower()}-scrape"
-                        ##endpoint = f"http://localhost:8000/pdf/{pdf_scraping_option.lower()}-scrape"
-                       
-                        response = requests.post(endpoint, files=files)
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            st.success(data["message"])
-                            st.markdown(data["markdown_content"])
-                            
-                            st.download_button(
-                                label="Download Markdown File",
-                                data=data["markdown_content"],
-                                file_name="extracted_data.md",
-                                mime="text/markdown"
-                            )
-                        else:
-                            st.error(f"Error: {response.json()['detail']}")
- 
- 
+                st.write(f"Upload your PDFs for {pdf_scraping_option}.")
+                pdf_files = st.file_uploader("Choose PDFs", type="pdf", accept_multiple_files=True, key=f"{pdf_scraping_option.lower()}_pdf")
+
+                if pdf_files and st.button("Start Scraping"):
+                    kind = PDF_JOB_KINDS[pdf_scraping_option]
+                    tasks = []
+                    for pdf_file in pdf_files:
+                        contents = pdf_file.getvalue()
+                        file_hash = hashlib.sha256(contents).hexdigest()
+                        display = {"markdown_folder": PDF_MARKDOWN_FOLDERS.get(kind), "file_name": pdf_file.name.replace(".pdf", ".md")}
+                        tasks.append((f"{pdf_file.name} ({pdf_scraping_option})", run_pdf_job, (file_hash, kind, pdf_file.name, contents), display))
+                    run_concurrently(tasks)
+
+
         elif scraping_option == 'Web Scraping':
             st.markdown("<h3>Select Web Scraping Method</h3>", unsafe_allow_html=True)
- 
+
             web_scraping_option = st.selectbox(
                 'Select Web Scraping Option',
                 ('Select Option', 'Selenium', 'ScrapingBee'),
                 index=0
             )
-            
+
             # Only show URL input and start button when a valid option is selected
             if web_scraping_option != 'Select Option':
-                # Text input for the URL
-                url = st.text_input(f"Enter URL For {web_scraping_option} Scraping:")
-                
-                # Show the "Start Scraping" button only when the URL is provided
-                if url:
+                # One URL per line
+                urls_text = st.text_area(f"Enter URLs For {web_scraping_option} Scraping (one per line):")
+                urls = list(dict.fromkeys(line.strip() for line in urls_text.splitlines() if line.strip()))
+
+                # Show the "Start Scraping" button only when a URL is provided
+                if urls:
                     if st.button("Start Scraping"):
-                        with st.spinner("Scraping in Progress..."):
-                            request_data = {
-                                "url": url,
-                                "method": web_scraping_option
-                            }
-                            
-                            # Make the POST request to the FastAPI server
-                            response = requests.post("https://bigdataspring2025assignment1.onrender.com/web/scrape", json=request_data)
-                            ##response = requests.post("http://localhost:8000/web/scrape", json=request_data)
-
-                            # Handle the response from FastAPI
-                            if response.status_code == 200:
-                                data = response.json()
-                                st.success(data["message"])
-                                st.markdown(data["markdown_content"])
-                                
-                                st.download_button(
-                                    label="Download Markdown File",
-                                    data=data["markdown_content"],
-                                    file_name="scraped_content.md",
-                                    mime="text/markdown"
-                                )
-                            else:
-                                st.error(f"Error: {response.json()['detail']}")
+                        display = {"file_name": "scraped_content.md"}
+                        run_concurrently([(f"{url} ({web_scraping_option})", run_web_job, (url, web_scraping_option), display) for url in urls])
                 else:
                     st.warning("Please Enter a Valid URL to Start Scraping.")
- 
- 
- 
+
+        show_results()
+
+
+
 if __name__ == '__main__':
     dashboard_page()
- 
\ No newline at end of file
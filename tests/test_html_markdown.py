@@ -0,0 +1,48 @@
+"""Golden-file tests for the html_to_markdown backends.
+
+Each ``golden/html_markdown/<name>.html`` is rendered by every backend and
+compared with ``<name>.<backend>.md`` when a backend is known to differ,
+otherwise with ``<name>.md``: the output of the original BeautifulSoup walk.
+"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "backend"))
+
+from htmlMarkdown import html_to_markdown, lxml
+
+GOLDEN_DIR = os.path.join(TESTS_DIR, "golden", "html_markdown")
+FIXTURES = sorted(name[:-len(".html")] for name in os.listdir(GOLDEN_DIR) if name.endswith(".html"))
+BACKENDS = [
+    "bs4",
+    "stream",
+    pytest.param("lxml", marks=pytest.mark.skipif(lxml is None, reason="lxml is not installed"))
+]
+
+
+def read(name):
+    with open(os.path.join(GOLDEN_DIR, name), encoding="utf-8") as golden:
+        return golden.read()
+
+
+def expected_markdown(fixture, backend):
+    if os.path.exists(os.path.join(GOLDEN_DIR, f"{fixture}.{backend}.md")):
+        return read(f"{fixture}.{backend}.md")
+    return read(f"{fixture}.md")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("fixture", FIXTURES)
+def test_matches_golden(fixture, backend):
+    markdown_content, images = html_to_markdown(read(f"{fixture}.html"), backend)
+    assert markdown_content == expected_markdown(fixture, backend)
+    # The image list is what gets downloaded; it must follow the rendered image links
+    assert [f"![Image]({img_url})" for img_url in images] == [line for line in markdown_content.splitlines() if line.startswith("![Image](")]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_empty_document(backend):
+    assert html_to_markdown("", backend) == ("# Webpage Content\n\n", [])